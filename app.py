@@ -2,18 +2,67 @@ import streamlit as st
 import os
 from io import BytesIO
 import tempfile
-import requests
 import re
 import time
-import speech_recognition as sr
-from gtts import gTTS
+import hashlib
+import logging
+import base64
+
+from cache_store import TwoTierCache, make_key
+from singleflight import SingleFlight
+from cv_sections import match_section_header, classify_line, PAGE_NUMBER_PATTERN
+from pdf_engine import extract_pdf_text, DEFAULT_ENGINE as PDF_ENGINE
+from tts_cache import speak, prewarm
+from turn_prefetch import TurnPrefetcher, turn_version
+from llm_client import chat_completion, stream_chat_completion, LLMError, DEFAULT_MODEL
+from interview_prompts import (
+    question_messages,
+    parse_questions,
+    interviewer_messages,
+    scoring_messages,
+    parse_evaluation
+)
+
+logging.basicConfig(level=logging.INFO)
+
+QUESTION_MODEL = DEFAULT_MODEL
+
+MAX_INTERVIEW_QUESTIONS = 4
+WELCOME_MESSAGE = "Hello! Welcome to the interview. I'm excited to learn more about your background and experience. Let's begin with the first question."
+TRANSITION_MESSAGES = [
+    "Great answer! Let me ask you the next question.",
+    "Excellent response! Moving on to the next question.",
+    "Thank you for sharing that. Here's my next question.",
+    "Nice response! Let's continue."
+]
+CLOSING_MESSAGE = "Thank you for your time! That concludes our interview."
+
+@st.cache_resource
+def get_cv_pipeline_cache():
+    """
+    Process-wide cache for extracted text, summaries and generated questions.
+    Set CV_CACHE_DIR to also keep entries on disk across restarts.
+    """
+    return TwoTierCache(
+        "cv_pipeline",
+        max_entries=int(os.environ.get("CV_CACHE_MAX_ENTRIES", "64")),
+        disk_dir=os.environ.get("CV_CACHE_DIR") or None,
+        disk_max_bytes=int(os.environ.get("CV_CACHE_DISK_MAX_BYTES", str(256 * 1024 * 1024)))
+    )
+
+@st.cache_resource
+def get_question_flight():
+    """
+    Process-wide coalescing of identical in-flight question generations:
+    sessions that miss the cache together wait for one LLM call
+    """
+    return SingleFlight("generate-questions")
 
 # PDF and DOCX parsing
-def extract_text_from_pdf(file_bytes):
+def extract_text_from_pdf(file_bytes, engine=PDF_ENGINE):
     try:
-        import PyPDF2
-        reader = PyPDF2.PdfReader(BytesIO(file_bytes))
-        text = "\n".join(page.extract_text() or "" for page in reader.pages)
+        # Pages are parsed lazily and extraction stops once the page/char budget is spent
+        text = extract_pdf_text(file_bytes, engine=engine)
         return text
     except Exception as e:
         return f"Error reading PDF: {e}"
@@ -27,6 +76,16 @@ def extract_text_from_docx(file_bytes):
     except Exception as e:
         return f"Error reading DOCX: {e}"
 
+def extract_cv_text(file_name, file_bytes):
+    """
+    Extract raw text from an uploaded CV based on its extension
+    """
+    if file_name.lower().endswith(".pdf"):
+        return extract_text_from_pdf(file_bytes)
+    elif file_name.lower().endswith(".docx"):
+        return extract_text_from_docx(file_bytes)
+    return "Unsupported file type."
+
 def extract_cv_content_intelligent(lines):
     """
     Intelligent extraction when no clear section headers are found
@@ -41,47 +100,15 @@ def extract_cv_content_intelligent(lines):
         'certifications': []
     }
     
-    # Keywords for classification
-    skill_keywords = ['python', 'java', 'javascript', 'react', 'node', 'docker', 'kubernetes', 
-                     'aws', 'azure', 'gcp', 'ci/cd', 'devops', 'git', 'sql', 'mongodb',
-                     'framework', 'library', 'database', 'tool', 'technology', 'angular', 'vue']
-    
-    experience_keywords = ['intern', 'developer', 'engineer', 'manager', 'analyst', 'consultant',
-                          'worked', 'developed', 'implemented', 'led', 'managed', 'designed']
-    
-    education_keywords = ['university', 'college', 'school', 'degree', 'bachelor', 'master',
-                         'diploma', 'baccalaureate', 'engineering', 'computer science', 'esprit']
-    
-    project_keywords = ['project', 'platform', 'application', 'system', 'website', 'app',
-                       'developed', 'built', 'created', 'implemented']
-    
-    cert_keywords = ['certification', 'certificate', 'certified', 'ccna', 'aws certified',
-                    'training', 'course']
-    
-    language_keywords = ['english', 'french', 'arabic', 'spanish', 'german', 'fluent', 'native']
-    
     for line in lines:
-        line_lower = line.lower()
-        
         # Skip very short lines
         if len(line) < 10:
             continue
         
-        # Classify line based on keywords
-        if any(kw in line_lower for kw in education_keywords):
-            sections['education'].append(line)
-        elif any(kw in line_lower for kw in cert_keywords):
-            sections['certifications'].append(line)
-        elif any(kw in line_lower for kw in language_keywords) and len(line) < 100:
-            sections['languages'].append(line)
-        elif any(kw in line_lower for kw in project_keywords):
-            sections['projects'].append(line)
-        elif any(kw in line_lower for kw in experience_keywords):
-            sections['experience'].append(line)
-        elif any(kw in line_lower for kw in skill_keywords):
-            sections['skills'].append(line)
-        elif re.search(r'\d{4}', line) and any(kw in line_lower for kw in ['tunis', 'intern', 'engineer']):
-            sections['experience'].append(line)
+        # Classify line based on keywords (single scan, see cv_sections)
+        section = classify_line(line)
+        if section:
+            sections[section].append(line)
     
     return sections
 
@@ -107,17 +134,6 @@ def summarize_cv(text):
     current_section = None
     buffer = []
     
-    # Section header patterns
-    section_headers = {
-        'profile': r'^(profile|summary|about|objective|introduction)$',
-        'skills': r'^(skills?|technical skills?|competenc|technologies|expertise)$',
-        'experience': r'^(experience|work experience|employment|professional experience)$',
-        'education': r'^(education|academic|qualifications?)$',
-        'projects': r'^(projects?|portfolio|work samples?)$',
-        'languages': r'^(languages?|linguistic skills?)$',
-        'certifications': r'^(certifications?|certificates?|training|courses?)$'
-    }
-    
     # Detect section headers and group content
     for line in lines:
         line_lower = line.lower().strip()
@@ -125,21 +141,20 @@ def summarize_cv(text):
         # Check if this is a major section header
         is_section_header = False
         if len(line.split()) <= 4:  # Section headers are usually short
-            for section_name, pattern in section_headers.items():
-                if re.match(pattern, line_lower, re.I):
-                    # Save previous section
-                    if current_section and buffer:
-                        sections[current_section].extend(buffer)
-                    
-                    current_section = section_name
-                    buffer = []
-                    is_section_header = True
-                    break
+            section_name = match_section_header(line_lower)
+            if section_name:
+                # Save previous section
+                if current_section and buffer:
+                    sections[current_section].extend(buffer)
+                
+                current_section = section_name
+                buffer = []
+                is_section_header = True
         
         # Add content to buffer if not a header
         if not is_section_header and line:
             # Filter out very short lines and page numbers
-            if len(line) > 5 and not re.match(r'^\d+$', line):
+            if len(line) > 5 and not PAGE_NUMBER_PATTERN.match(line):
                 buffer.append(line)
     
     # Save last section
@@ -242,89 +257,67 @@ def summarize_cv(text):
     
     return summary.strip()
 
-def generate_questions_with_ai(summary, api_key, num_questions=4):
+class FallbackQuestions(Exception):
     """
-    Use OpenRouter AI (Llama 3.3 70B) to generate intelligent, contextual interview questions
+    Raised by ai_questions_or_raise when the AI call failed, carrying the
+    template questions to show instead, so they are never cached as AI output
     """
-    try:
-        # Prepare the prompt for AI
-        prompt = f"""You are an experienced technical recruiter conducting job interviews. Based on the following candidate's CV summary, generate exactly {num_questions} insightful interview questions.
 
-Requirements for questions:
-1. Be SPECIFIC to the candidate's actual experience, skills, and projects mentioned in their CV
-2. Test both technical knowledge and problem-solving abilities
-3. Be open-ended to encourage detailed responses
-4. Cover different aspects: technical skills, projects, experience, and soft skills
-5. Make questions conversational and professional
+    def __init__(self, questions):
+        super().__init__("AI question generation fell back to template questions")
+        self.questions = questions
 
-CV Summary:
-{summary}
-
-Generate exactly {num_questions} interview questions. Format each question on a new line, numbered 1-{num_questions}. Do not add any other text or explanations."""
-
-        # Call OpenRouter API with Llama 3.3 70B
-        response = requests.post(
-            'https://openrouter.ai/api/v1/chat/completions',
-            headers={
-                'Authorization': f'Bearer {api_key}',
-                'Content-Type': 'application/json',
+def generate_questions_with_ai(summary, api_key, num_questions=4):
+    """
+    Use OpenRouter AI (Llama 3.3 70B) to generate intelligent, contextual interview questions.
+    Returns (questions, from_ai); from_ai is False when only fallback questions could be produced
+    """
+    try:
+        questions_text = chat_completion(
+            question_messages(summary, num_questions),
+            api_key,
+            model=QUESTION_MODEL,
+            temperature=0.7,
+            max_tokens=500,
+            extra_headers={
                 'HTTP-Referer': 'https://github.com/your-repo',
                 'X-Title': 'CV Interview Assistant'
-            },
-            json={
-                'model': 'meta-llama/llama-3.3-70b-instruct:free',
-                'messages': [
-                    {
-                        'role': 'system',
-                        'content': 'You are an expert technical recruiter. Generate interview questions based on the candidate\'s CV. Be specific and relevant.'
-                    },
-                    {
-                        'role': 'user',
-                        'content': prompt
-                    }
-                ],
-                'temperature': 0.7,
-                'max_tokens': 500
-            },
-            timeout=30
+            }
         )
         
-        if response.status_code == 200:
-            result = response.json()
-            questions_text = result['choices'][0]['message']['content']
-            
-            st.success("✅ AI generated personalized questions from your CV!")
-            
-            # Parse questions from response
-            questions = []
-            lines = questions_text.strip().split('\n')
-            for line in lines:
-                line = line.strip()
-                # Match patterns like "1.", "1)", "Q1:", "Question 1:", etc.
-                if re.match(r'^(question\s+)?[\d]+[\.\):]?\s+', line, re.IGNORECASE):
-                    # Remove the number prefix
-                    question = re.sub(r'^(question\s+)?[\d]+[\.\):]?\s+', '', line, flags=re.IGNORECASE).strip()
-                    if question and len(question) > 10:
-                        questions.append(question)
-            
-            # Ensure we have exactly num_questions
-            if len(questions) >= num_questions:
-                return questions[:num_questions]
-            else:
-                st.warning(f"AI generated only {len(questions)} questions. Adding fallback questions to reach {num_questions}.")
-                # Add fallback questions to reach the target
-                fallback = generate_questions_fallback(summary, num_questions)
-                questions.extend(fallback[len(questions):])
-                return questions[:num_questions]
+        st.success("✅ AI generated personalized questions from your CV!")
+        
+        # Parse questions from response
+        questions = parse_questions(questions_text)
+        
+        # Ensure we have exactly num_questions
+        if len(questions) >= num_questions:
+            return questions[:num_questions], True
         else:
-            st.error(f"API Error {response.status_code}: {response.text}")
-            st.info("Using fallback questions based on your CV content.")
-            return generate_questions_fallback(summary, num_questions)
+            st.warning(f"AI generated only {len(questions)} questions. Adding fallback questions to reach {num_questions}.")
+            # Add fallback questions to reach the target
+            fallback = generate_questions_fallback(summary, num_questions)
+            questions.extend(fallback[len(questions):])
+            return questions[:num_questions], True
             
+    except LLMError as e:
+        st.error(str(e))
+        st.info("Using fallback questions based on your CV content.")
+        return generate_questions_fallback(summary, num_questions), False
     except Exception as e:
         st.error(f"AI question generation failed: {str(e)}")
         st.info("Using fallback questions based on your CV content.")
-        return generate_questions_fallback(summary, num_questions)
+        return generate_questions_fallback(summary, num_questions), False
+
+def ai_questions_or_raise(summary, api_key, num_questions=4):
+    """
+    generate_questions_with_ai for the cache: a fallback raises FallbackQuestions
+    so that a transient API error is not stored under the AI questions key
+    """
+    questions, from_ai = generate_questions_with_ai(summary, api_key, num_questions)
+    if not from_ai:
+        raise FallbackQuestions(questions)
+    return questions
 
 def generate_questions_fallback(summary, num_questions=4):
     """
@@ -390,95 +383,104 @@ def chat_with_ai(message, cv_summary, conversation_history, api_key):
     Interactive chat with AI interviewer about the CV
     """
     try:
-        # Build conversation context
-        system_prompt = f"""You are an experienced technical interviewer conducting an interview. 
-You have reviewed the candidate's CV:
-
-{cv_summary}
-
-Your role is to:
-- Ask insightful follow-up questions based on their responses
-- Probe deeper into their technical experience
-- Assess their problem-solving abilities
-- Be professional but conversational
-- Keep responses concise (2-3 sentences max)"""
-
-        messages = [{'role': 'system', 'content': system_prompt}]
-        
-        # Add conversation history
-        for msg in conversation_history:
-            messages.append(msg)
-        
-        # Add current message
-        messages.append({'role': 'user', 'content': message})
-        
-        # Call Ollama API
-        response = requests.post(
-            'https://openrouter.ai/api/v1/chat/completions',
-            headers={
-                'Authorization': f'Bearer {api_key}',
-                'Content-Type': 'application/json'
-            },
-            json={
-                'model': 'meta-llama/llama-3.3-70b-instruct:free',
-                'messages': messages
-            },
-            timeout=30
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
-            ai_response = result['choices'][0]['message']['content']
-            return ai_response, None
-        else:
-            return None, f"API Error: {response.status_code}"
-            
+        messages = interviewer_messages(message, cv_summary, conversation_history)
+        ai_response = chat_completion(messages, api_key)
+        return ai_response, None
+    except LLMError as e:
+        status = f": {e.status_code}" if e.status_code else f" - {e}"
+        return None, f"API Error{status}"
     except Exception as e:
         return None, f"Error: {str(e)}"
 
+def chat_with_ai_stream(message, cv_summary, conversation_history, api_key):
+    """
+    Streaming variant of chat_with_ai: yields the interviewer's reply as it is
+    generated, suitable for st.write_stream
+    """
+    messages = interviewer_messages(message, cv_summary, conversation_history)
+    try:
+        yield from stream_chat_completion(messages, api_key)
+    except LLMError as e:
+        yield f"\n\n⚠️ {e}"
+
 def tts_to_audio(text, api_key=None, speaker_wav=None, language="en"):
     """
     Use Google Text-to-Speech (gTTS) - No API key needed!
-    Works reliably and sounds natural
+    Audio is cached by normalized text, so repeated sentences play instantly
     """
-    try:
-        # Clean text for TTS (remove markdown formatting)
-        clean_text = text.replace("**", "").replace("*", "").replace("-", "").replace("•", "").strip()
-        clean_text = re.sub(r'##\s+[^\n]+', '', clean_text)  # Remove markdown headers
-        clean_text = re.sub(r'[🎯💼🚀🎓🌐📜👤📄⚠️💡✅❓]', '', clean_text)  # Remove emojis
-        
-        # Limit text length
-        if len(clean_text) > 500:
-            clean_text = clean_text[:500]
-            last_period = clean_text.rfind('.')
-            if last_period > 100:
-                clean_text = clean_text[:last_period + 1]
-        
-        # Remove newlines and extra spaces
-        clean_text = " ".join(clean_text.split())
-        
-        if not clean_text or len(clean_text) < 10:
-            return None, "Text too short for TTS"
-        
-        # Generate speech using Google TTS
-        tts = gTTS(text=clean_text, lang='en', slow=False)
-        
-        # Save to BytesIO object
-        audio_fp = BytesIO()
-        tts.write_to_fp(audio_fp)
-        audio_fp.seek(0)
-        
-        return audio_fp.read(), None
-        
-    except ImportError:
-        return None, "gTTS library not installed. Run: pip install gtts"
-    except Exception as e:
-        return None, f"TTS Error: {str(e)}"
+    return speak(text, language=language)
+
+def interview_audio_script(questions):
+    """
+    Every line the interviewer will speak, in the exact form it is synthesized
+    """
+    script = [f"{WELCOME_MESSAGE} {questions[0]}"] if questions else []
+    for index, question in enumerate(questions[1:MAX_INTERVIEW_QUESTIONS], 1):
+        transition_msg = TRANSITION_MESSAGES[min(index - 1, len(TRANSITION_MESSAGES) - 1)]
+        script.append(f"{transition_msg} {question}")
+    script.append(CLOSING_MESSAGE)
+    return script
+
+def build_turn(questions, index):
+    """
+    The interviewer's turn after answer `index - 1`: transition + question `index`,
+    or the closing line after the last question, with its autoplay audio.
+    Runs in the prefetch thread, so it must not touch st.*
+    """
+    closing = index >= min(MAX_INTERVIEW_QUESTIONS, len(questions))
+    if closing:
+        messages = [CLOSING_MESSAGE]
+    else:
+        messages = [TRANSITION_MESSAGES[min(index - 1, len(TRANSITION_MESSAGES) - 1)], questions[index]]
+    audio_bytes, _ = tts_to_audio(" ".join(messages))  # Same text as interview_audio_script
+    return {
+        "index": index,
+        "closing": closing,
+        "messages": messages,
+        "audio_base64": base64.b64encode(audio_bytes).decode() if audio_bytes else None
+    }
+
+def advance_interview():
+    """
+    Move to the next interviewer turn once an answer is recorded, using the
+    turn prepared while the candidate was answering when it is still valid
+    """
+    state = st.session_state
+    questions = state.interview_questions
+    index = state.current_question_index
+    turn = state.turn_prefetcher.take(turn_version(questions, index), lambda: build_turn(questions, index))
+    for message in turn["messages"]:
+        state.interview_conversation.append({
+            'type': 'ai',
+            'message': message
+        })
+    state.pending_turn = turn
+    state.waiting_for_answer = not turn["closing"]
+    state.interview_complete = turn["closing"]
+
+def play_pending_turn():
+    """
+    Autoplay the turn queued by advance_interview and record the submit-to-audio gap
+    """
+    turn = st.session_state.pending_turn
+    st.session_state.pending_turn = None
+    if turn["audio_base64"]:
+        st.markdown(f"""
+        <audio autoplay>
+            <source src="data:audio/mp3;base64,{turn['audio_base64']}" type="audio/mp3">
+        </audio>
+        """, unsafe_allow_html=True)
+    if st.session_state.turn_submitted_at is not None:
+        st.session_state.turn_prefetcher.record_gap(time.perf_counter() - st.session_state.turn_submitted_at)
+        st.session_state.turn_submitted_at = None
+    logging.info("Turn prefetch stats: %s", st.session_state.turn_prefetcher.stats())
 
 def speech_to_text():
     """
     Convert speech to text using speech_recognition library
     """
+    import speech_recognition as sr  # Loaded on first use, not at app start-up
+    
     try:
         recognizer = sr.Recognizer()
         
@@ -513,6 +515,7 @@ def main():
     enable_tts = True
     tts_enabled = True
     speaker_wav = None
+    num_questions = MAX_INTERVIEW_QUESTIONS
     
     # Main content
     uploaded_file = st.file_uploader("Choose your CV file", type=["pdf", "docx"])
@@ -520,14 +523,15 @@ def main():
     if uploaded_file:
         st.success(f"File '{uploaded_file.name}' uploaded successfully!")
         
-        # Extract text
-        file_bytes = uploaded_file.read()
-        if uploaded_file.name.lower().endswith(".pdf"):
-            text = extract_text_from_pdf(file_bytes)
-        elif uploaded_file.name.lower().endswith(".docx"):
-            text = extract_text_from_docx(file_bytes)
-        else:
-            text = "Unsupported file type."
+        # Extract text (memoized by content hash so reruns skip the work)
+        file_bytes = uploaded_file.getvalue()
+        cv_cache = get_cv_pipeline_cache()
+        cv_digest = hashlib.sha256(file_bytes).hexdigest()
+        file_ext = os.path.splitext(uploaded_file.name.lower())[1]
+        text = cv_cache.get_or_compute(
+            make_key("text", cv_digest, file_ext),
+            lambda: extract_cv_text(uploaded_file.name, file_bytes)
+        )
         
         # Show raw text if requested
         if show_raw_text:
@@ -539,7 +543,10 @@ def main():
         st.subheader("CV Summary")
         
         with st.spinner("Analyzing your CV..."):
-            summary = summarize_cv(text)
+            summary = cv_cache.get_or_compute(
+                make_key("summary", cv_digest, file_ext),
+                lambda: summarize_cv(text)
+            )
         
         st.markdown(summary)
         
@@ -563,9 +570,22 @@ def main():
         # Use AI to generate questions if enabled
         if enable_ai and ollama_api_key:
             with st.spinner("AI is generating personalized interview questions..."):
-                questions = generate_questions_with_ai(summary, ollama_api_key)
+                questions_key = make_key("questions", cv_digest, file_ext, num_questions, QUESTION_MODEL)
+                try:
+                    questions = get_question_flight().do(
+                        questions_key,
+                        lambda: cv_cache.get_or_compute(
+                            questions_key,
+                            lambda: ai_questions_or_raise(summary, ollama_api_key, num_questions)
+                        )
+                    )
+                except FallbackQuestions as e:
+                    # Not cached: the next run tries the AI again
+                    questions = e.questions
         else:
-            questions = generate_questions_fallback(summary)
+            questions = generate_questions_fallback(summary, num_questions)
+        logging.info("CV pipeline cache stats: %s, question single-flight: %s",
+                     cv_cache.stats(), get_question_flight().stats())
         
         for i, q in enumerate(questions, 1):
             with st.container():
@@ -601,10 +621,12 @@ def main():
                 st.session_state.interview_complete = False
             if 'waiting_for_answer' not in st.session_state:
                 st.session_state.waiting_for_answer = False
-            if 'play_audio_on_load' not in st.session_state:
-                st.session_state.play_audio_on_load = False
-            if 'pending_transition_audio' not in st.session_state:
-                st.session_state.pending_transition_audio = None
+            if 'pending_turn' not in st.session_state:
+                st.session_state.pending_turn = None
+            if 'turn_submitted_at' not in st.session_state:
+                st.session_state.turn_submitted_at = None
+            if 'turn_prefetcher' not in st.session_state:
+                st.session_state.turn_prefetcher = TurnPrefetcher()
             
             # Start button
             if not st.session_state.interview_started:
@@ -614,8 +636,11 @@ def main():
                 if st.button("🚀 Start Interview", type="primary", key="start_interview"):
                     st.session_state.interview_started = True
                     
+                    # Synthesize every interviewer line in the background
+                    prewarm(interview_audio_script(st.session_state.interview_questions))
+                    
                     # Add welcome message
-                    welcome_msg = "Hello! Welcome to the interview. I'm excited to learn more about your background and experience. Let's begin with the first question."
+                    welcome_msg = WELCOME_MESSAGE
                     st.session_state.interview_conversation.append({
                         'type': 'ai',
                         'message': welcome_msg
@@ -681,33 +706,9 @@ def main():
                     """, unsafe_allow_html=True)
                     
                     # Auto-play audio for questions
-                    if st.session_state.pending_transition_audio:
-                        # Play transition message first, then question
-                        transition_msg = st.session_state.pending_transition_audio
-                        combined_msg = f"{transition_msg} {current_question}"
-                        audio_bytes, _ = tts_to_audio(combined_msg)
-                        if audio_bytes:
-                            import base64
-                            audio_base64 = base64.b64encode(audio_bytes).decode()
-                            st.markdown(f"""
-                            <audio autoplay>
-                                <source src="data:audio/mp3;base64,{audio_base64}" type="audio/mp3">
-                            </audio>
-                            """, unsafe_allow_html=True)
-                        st.session_state.pending_transition_audio = None
-                        st.session_state.play_audio_on_load = False
-                    elif st.session_state.play_audio_on_load:
-                        # Play audio for current question after page reload
-                        audio_bytes, _ = tts_to_audio(current_question)
-                        if audio_bytes:
-                            import base64
-                            audio_base64 = base64.b64encode(audio_bytes).decode()
-                            st.markdown(f"""
-                            <audio autoplay>
-                                <source src="data:audio/mp3;base64,{audio_base64}" type="audio/mp3">
-                            </audio>
-                            """, unsafe_allow_html=True)
-                        st.session_state.play_audio_on_load = False
+                    if st.session_state.pending_turn:
+                        # Transition + question, prepared while the previous answer was being written
+                        play_pending_turn()
                     elif len(st.session_state.interview_conversation) == 2 and st.session_state.current_question_index == 0:
                         # First question - play welcome + question
                         welcome_msg = st.session_state.interview_conversation[0]['message']
@@ -722,6 +723,14 @@ def main():
                             </audio>
                             """, unsafe_allow_html=True)
                     
+                    # Prepare the next turn (text + audio) while the candidate answers this one
+                    questions_snapshot = list(st.session_state.interview_questions)
+                    next_index = st.session_state.current_question_index + 1
+                    st.session_state.turn_prefetcher.schedule(
+                        turn_version(questions_snapshot, next_index),
+                        lambda: build_turn(questions_snapshot, next_index)
+                    )
+                    
                     st.markdown("### Choose how to answer:")
                     
                     col1, col2 = st.columns(2)
@@ -743,55 +752,9 @@ def main():
                                     'message': text_answer
                                 })
                                 
+                                st.session_state.turn_submitted_at = time.perf_counter()
                                 st.session_state.current_question_index += 1
-                                
-                                # Check if more questions (must be less than 4 AND within array bounds)
-                                if st.session_state.current_question_index < 4 and st.session_state.current_question_index < len(st.session_state.interview_questions):
-                                    st.session_state.waiting_for_answer = True
-                                    transition_messages = [
-                                        "Great answer! Let me ask you the next question.",
-                                        "Excellent response! Moving on to the next question.",
-                                        "Thank you for sharing that. Here's my next question.",
-                                        "Nice response! Let's continue."
-                                    ]
-                                    msg_index = min(st.session_state.current_question_index - 1, len(transition_messages) - 1)
-                                    transition_msg = transition_messages[msg_index]
-                                    
-                                    st.session_state.interview_conversation.append({
-                                        'type': 'ai',
-                                        'message': transition_msg
-                                    })
-                                    
-                                    # Add next question - with bounds check
-                                    next_question = st.session_state.interview_questions[st.session_state.current_question_index]
-                                    st.session_state.interview_conversation.append({
-                                        'type': 'ai',
-                                        'message': next_question
-                                    })
-                                    
-                                    # Store transition message to play with question
-                                    st.session_state.pending_transition_audio = transition_msg
-                                    st.session_state.play_audio_on_load = True
-                                else:
-                                    # Interview complete
-                                    st.session_state.waiting_for_answer = False
-                                    closing_msg = "Thank you for your time! That concludes our interview."
-                                    st.session_state.interview_conversation.append({
-                                        'type': 'ai',
-                                        'message': closing_msg
-                                    })
-                                    
-                                    audio_bytes, _ = tts_to_audio(closing_msg)
-                                    if audio_bytes:
-                                        import base64
-                                        audio_base64 = base64.b64encode(audio_bytes).decode()
-                                        st.markdown(f"""
-                                        <audio autoplay>
-                                            <source src="data:audio/mp3;base64,{audio_base64}" type="audio/mp3">
-                                        </audio>
-                                        """, unsafe_allow_html=True)
-                                    
-                                    st.session_state.interview_complete = True
+                                advance_interview()
                                 
                                 st.rerun()
                             else:
@@ -814,55 +777,9 @@ def main():
                                         'message': speech_text
                                     })
                                     
+                                    st.session_state.turn_submitted_at = time.perf_counter()
                                     st.session_state.current_question_index += 1
-                                    
-                                    # Check if more questions (must be less than 4 AND within array bounds)
-                                    if st.session_state.current_question_index < 4 and st.session_state.current_question_index < len(st.session_state.interview_questions):
-                                        st.session_state.waiting_for_answer = True
-                                        transition_messages = [
-                                            "Great answer! Let me ask you the next question.",
-                                            "Excellent response! Moving on to the next question.",
-                                            "Thank you for sharing that. Here's my next question.",
-                                            "Nice response! Let's continue."
-                                        ]
-                                        msg_index = min(st.session_state.current_question_index - 1, len(transition_messages) - 1)
-                                        transition_msg = transition_messages[msg_index]
-                                        
-                                        st.session_state.interview_conversation.append({
-                                            'type': 'ai',
-                                            'message': transition_msg
-                                        })
-                                        
-                                        # Add next question - with bounds check
-                                        next_question = st.session_state.interview_questions[st.session_state.current_question_index]
-                                        st.session_state.interview_conversation.append({
-                                            'type': 'ai',
-                                            'message': next_question
-                                        })
-                                        
-                                        # Store transition message to play with question
-                                        st.session_state.pending_transition_audio = transition_msg
-                                        st.session_state.play_audio_on_load = True
-                                    else:
-                                        # Interview complete
-                                        st.session_state.waiting_for_answer = False
-                                        closing_msg = "Thank you for your time! That concludes our interview."
-                                        st.session_state.interview_conversation.append({
-                                            'type': 'ai',
-                                            'message': closing_msg
-                                        })
-                                        
-                                        audio_bytes, _ = tts_to_audio(closing_msg)
-                                        if audio_bytes:
-                                            import base64
-                                            audio_base64 = base64.b64encode(audio_bytes).decode()
-                                            st.markdown(f"""
-                                            <audio autoplay>
-                                                <source src="data:audio/mp3;base64,{audio_base64}" type="audio/mp3">
-                                            </audio>
-                                            """, unsafe_allow_html=True)
-                                        
-                                        st.session_state.interview_complete = True
+                                    advance_interview()
                                     
                                     time.sleep(1)
                                     st.rerun()
@@ -872,92 +789,39 @@ def main():
             # Interview complete
             elif st.session_state.interview_complete:
                 st.success("🎉 Interview Complete!")
+                if st.session_state.pending_turn:
+                    play_pending_turn()
                 
                 # Generate score if not already generated
                 if 'interview_score' not in st.session_state:
-                    with st.spinner("Evaluating your responses..."):
-                        # Prepare conversation for scoring
-                        user_responses = []
-                        for msg in st.session_state.interview_conversation:
-                            if msg['type'] == 'user':
-                                user_responses.append(msg['message'])
-                        
-                        # Call AI to score the interview
-                        score_prompt = f"""You are an experienced technical recruiter evaluating a candidate's interview performance.
-
-Interview Questions and Candidate's Responses:
-"""
-                        for i, (question, response) in enumerate(zip(st.session_state.interview_questions, user_responses), 1):
-                            score_prompt += f"\nQuestion {i}: {question}\nCandidate's Response: {response}\n"
+                    # Prepare conversation for scoring
+                    user_responses = []
+                    for msg in st.session_state.interview_conversation:
+                        if msg['type'] == 'user':
+                            user_responses.append(msg['message'])
+                    
+                    # Stream the AI evaluation so the candidate sees it as it is written
+                    st.markdown("**Evaluating your responses...**")
+                    try:
+                        ai_evaluation = st.write_stream(stream_chat_completion(
+                            scoring_messages(st.session_state.interview_questions, user_responses),
+                            ollama_api_key,
+                            temperature=0.3,
+                            max_tokens=300
+                        ))
                         
-                        score_prompt += """
-Based on the candidate's responses, evaluate their performance on the following criteria:
-1. Technical knowledge and expertise
-2. Communication skills and clarity
-3. Problem-solving abilities
-4. Relevance and depth of answers
-5. Overall professionalism
-
-Provide a score from 0 to 10 (where 10 is excellent) and a brief 2-3 sentence feedback explaining the score.
-
-Format your response EXACTLY as:
-SCORE: [number from 0-10]
-FEEDBACK: [your 2-3 sentence feedback]"""
-
-                        try:
-                            response = requests.post(
-                                'https://openrouter.ai/api/v1/chat/completions',
-                                headers={
-                                    'Authorization': f'Bearer {ollama_api_key}',
-                                    'Content-Type': 'application/json'
-                                },
-                                json={
-                                    'model': 'meta-llama/llama-3.3-70b-instruct:free',
-                                    'messages': [
-                                        {
-                                            'role': 'system',
-                                            'content': 'You are an expert technical recruiter evaluating interview performance. Be fair but constructive in your evaluation.'
-                                        },
-                                        {
-                                            'role': 'user',
-                                            'content': score_prompt
-                                        }
-                                    ],
-                                    'temperature': 0.3,
-                                    'max_tokens': 300
-                                },
-                                timeout=30
-                            )
-                            
-                            if response.status_code == 200:
-                                result = response.json()
-                                ai_evaluation = result['choices'][0]['message']['content']
-                                
-                                # Parse score and feedback
-                                score_match = re.search(r'SCORE:\s*(\d+(?:\.\d+)?)', ai_evaluation, re.IGNORECASE)
-                                feedback_match = re.search(r'FEEDBACK:\s*(.+)', ai_evaluation, re.IGNORECASE | re.DOTALL)
-                                
-                                if score_match:
-                                    score = float(score_match.group(1))
-                                    score = min(10, max(0, score))  # Ensure score is between 0-10
-                                else:
-                                    score = 7.0  # Default score if parsing fails
-                                
-                                if feedback_match:
-                                    feedback = feedback_match.group(1).strip()
-                                else:
-                                    feedback = "Good effort in the interview. Keep practicing to improve your responses."
-                                
-                                st.session_state.interview_score = score
-                                st.session_state.interview_feedback = feedback
-                            else:
-                                # Fallback scoring
-                                st.session_state.interview_score = 7.0
-                                st.session_state.interview_feedback = "Thank you for completing the interview. Your responses showed good understanding of the topics discussed."
-                        except Exception as e:
+                        if ai_evaluation:
+                            score, feedback = parse_evaluation(ai_evaluation)
+                            st.session_state.interview_score = score
+                            st.session_state.interview_feedback = feedback
+                        else:
                             # Fallback scoring
                             st.session_state.interview_score = 7.0
                             st.session_state.interview_feedback = "Thank you for completing the interview. Your responses showed good understanding of the topics discussed."
+                    except Exception as e:
+                        # Fallback scoring
+                        st.session_state.interview_score = 7.0
+                        st.session_state.interview_feedback = "Thank you for completing the interview. Your responses showed good understanding of the topics discussed."
                 
                 # Display score
                 st.markdown("---")
@@ -1,24 +1,56 @@
-from fastapi import FastAPI, UploadFile, File, Form
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, JSONResponse
 from io import BytesIO
-import shutil, os, json, re
+from typing import Optional
+import asyncio
+import os, sys, json, re, time, threading
+
+_import_started = time.perf_counter()
+
+# Shared helpers (caches, LLM client) live at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import your existing functions
 from cv_utils import (
     extract_text_from_pdf,
     extract_text_from_docx,
     summarize_cv,
-    generate_questions_with_ai,
-    chat_with_ai,
-    tts_to_audio,
+    generate_questions_fallback,
     speech_to_text
 )
+from tts_cache import speak, audio_cache
+import llm_client
+import chat_context
+from llm_client import chat_completion, stream_chat_completion, LLMError
+from interview_prompts import question_messages, parse_questions, interviewer_messages, scoring_messages, parse_evaluation
+from model_registry import registry, models_from_env
+from executors import cpu_pool, io_pool, loop_lag, add_worker_models, Overloaded
+from uploads import save_upload, sweep_forever, RequestSizeLimit
+from result_cache import result_cache, transcription_key, emotion_key
+from singleflight import SingleFlight
+from cache_store import make_key
 
 
 # If you have a facial emotion module
-from facial_emotion import analyze_facial_emotions
-from audio_transcribe import transcribe_audio
+from facial_emotion import (
+    analyze_facial_emotions,
+    analyze_range,
+    plan_ranges,
+    merge_timelines,
+    summarize_timeline,
+    sample_interval,
+    analyze_frame_bytes,
+    EmotionAggregate
+)
+import audio_transcribe
+from audio_transcribe import (
+    transcribe_with_stats,
+    record_transcription,
+    SpeechSegmenter,
+    transcribe_segment,
+    open_stream_decoder
+)
 import logging
 # 8️⃣ Feedback Endpoint
 from cv_utils import generate_feedback  # new function you will add
@@ -30,6 +62,10 @@ app = FastAPI(title="AI Interview Backend")
 
 
 
+# Oversized uploads are refused before their body is read (inside CORS,
+# so the browser still sees the 413)
+app.add_middleware(RequestSizeLimit)
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -43,6 +79,73 @@ app.add_middleware(
 os.makedirs("videos", exist_ok=True)
 os.makedirs("audios", exist_ok=True)
 
+# Models listed in WARMUP_MODELS (e.g. "whisper,deepface") load in the
+# background at startup; everything else loads on first use.
+WARMUP_MODELS = models_from_env()
+
+
+# Whisper and DeepFace run in the CPU worker processes, so that is where
+# they are loaded (by the pool initializer); this holds the model status
+# reported by each worker (pid -> status), collected at pool restart count
+# warm_state["restarts"].
+worker_models = {}
+warm_state = {"restarts": None, "task": None}
+
+
+async def _warm_cpu_pool():
+    # Starts every worker process and waits for each to report its models
+    restarts = cpu_pool.restarts
+    reports = await cpu_pool.start_workers()
+    worker_models.clear()
+    worker_models.update({str(pid): status for pid, status in reports.items()})
+    warm_state["restarts"] = restarts
+    return dict(worker_models)
+
+
+async def _warm_in_background():
+    try:
+        await _warm_cpu_pool()
+    except Exception as e:
+        logging.warning(f"CPU pool warmup failed: {e}")
+
+
+def _start_warmup():
+    if warm_state["task"] is None or warm_state["task"].done():
+        warm_state["task"] = asyncio.get_running_loop().create_task(_warm_in_background())
+
+
+def _workers_ready():
+    if not WARMUP_MODELS:
+        return True
+    if warm_state["restarts"] != cpu_pool.restarts:
+        return False  # Never warmed, or the pool was replaced since
+    return len(worker_models) == cpu_pool.workers and all(
+        status.get(name, {}).get("loaded") for status in worker_models.values() for name in WARMUP_MODELS
+    )
+
+
+@app.on_event("startup")
+async def startup():
+    loop_lag.start()
+    asyncio.get_running_loop().create_task(sweep_forever(["videos", "audios"]))
+    if WARMUP_MODELS:
+        _start_warmup()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    cpu_pool.shutdown()
+    io_pool.shutdown()
+
+
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request, exc):
+    return JSONResponse(
+        status_code=503,
+        content={"error": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
 # ---------------- Endpoints ---------------- #
 
 
@@ -52,7 +155,7 @@ async def feedback_endpoint(
     answer: str = Form(...),
     facial_result: str = Form(...)
 ):
-    feedback_text = generate_feedback(question, answer, facial_result)
+    feedback_text = await io_pool.run(generate_feedback, question, answer, facial_result)
     return {"feedback": feedback_text}
 
 
@@ -68,47 +171,251 @@ async def generate_feedback_endpoint(
     so we map `summary` -> answer. `question` is optional.
     """
     try:
-        feedback_text = generate_feedback(question or '', summary or '', facial or '')
+        feedback_text = await io_pool.run(generate_feedback, question or '', summary or '', facial or '')
+    except Overloaded:
+        raise
     except Exception as e:
         feedback_text = f"Error generating feedback: {str(e)}"
     return {"feedback": feedback_text}
 
 # 1️⃣ Facial emotion analysis
 @app.post("/analyze_video")
-async def analyze_video(file: UploadFile = File(...)):
-    file_location = f"videos/{file.filename}"
-    with open(file_location, "wb") as f:
-        shutil.copyfileobj(file.file, f)
-    result = analyze_facial_emotions(file_location)
+async def analyze_video(
+    file: UploadFile = File(...),
+    sample_fps: Optional[float] = Form(None),
+    every_seconds: Optional[float] = Form(None),
+    parallel: int = Form(1)
+):
+    """Analyze one frame every `every_seconds` (or `sample_fps` frames per second),
+    split into up to `parallel` time ranges analyzed by separate CPU workers."""
+    try:
+        interval = sample_interval(sample_fps, every_seconds)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    file_location, digest = await save_upload(file, "videos")
+    return await _analyze_saved_video(file_location, digest, interval, parallel)
+
+
+async def _analyze_saved_video(file_location, digest, interval, parallel=1):
+    key = emotion_key(digest, interval)
+    cached = await io_pool.run(result_cache.get, key)
+    if cached is not None:
+        return cached
+    parts = max(1, min(parallel, cpu_pool.workers))
+    if parts == 1:
+        result = await cpu_pool.run(analyze_facial_emotions, file_location, every_seconds=interval)
+    else:
+        ranges = await cpu_pool.run(plan_ranges, file_location, interval, parts)
+        range_results = await asyncio.gather(
+            *(cpu_pool.run(analyze_range, file_location, interval, start, end) for start, end in ranges)
+        )
+        result = summarize_timeline(merge_timelines(range_results))
+    await io_pool.run(result_cache.set, key, result)
     return result
 
+# 1️⃣b Live facial emotion stream
+MAX_FRAME_BYTES = int(os.environ.get("MAX_FRAME_BYTES", str(2 * 1024 * 1024)))
+
+
+@app.websocket("/ws/emotions")
+async def emotions_websocket(websocket: WebSocket):
+    """Receive JPEG frames as binary messages and reply with the rolling
+    aggregate after each analyzed frame. Send {"event": "end"} to get the
+    final summary (same format as /analyze_video).
+
+    Only one frame per connection is analyzed at a time; frames that arrive
+    meanwhile are dropped, so a slow CPU lowers the sample rate instead of
+    building a backlog."""
+    await websocket.accept()
+    aggregate = EmotionAggregate()
+    started = time.monotonic()
+    pending = None
+    dropped = 0
+
+    async def analyze(image_bytes, second):
+        nonlocal dropped
+        try:
+            emotion = await cpu_pool.run(analyze_frame_bytes, image_bytes)
+        except Exception as e:
+            dropped += 1
+            if not isinstance(e, Overloaded):
+                logging.warning(f"Live frame analysis failed: {e}")
+            return
+        if emotion is not None:
+            aggregate.add(second, emotion)
+        await websocket.send_json({**aggregate.snapshot(), "dropped": dropped})
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("bytes") is not None:
+                frame = message["bytes"]
+                if len(frame) > MAX_FRAME_BYTES or (pending is not None and not pending.done()):
+                    dropped += 1
+                    continue
+                pending = asyncio.ensure_future(analyze(frame, time.monotonic() - started))
+            elif message.get("text") is not None:
+                try:
+                    event = json.loads(message["text"]).get("event")
+                except (ValueError, AttributeError):
+                    event = None
+                if event == "end":
+                    if pending is not None:
+                        await pending
+                    await websocket.send_json({"event": "summary", "dropped": dropped, **aggregate.summary()})
+                    await websocket.close()
+                    break
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if pending is not None and not pending.done():
+            pending.cancel()
+
 # 2️⃣ Audio transcription
 @app.post("/transcribe_audio")
 async def transcribe_audio_endpoint(file: UploadFile = File(...)):
-    file_location = f"audios/{file.filename}"
-    with open(file_location, "wb") as f:
-        shutil.copyfileobj(file.file, f)
-    text = transcribe_audio(file_location)
-    return {"transcription": text}
+    file_location, digest = await save_upload(file, "audios")
+    return await _transcribe_saved_audio(file_location, digest)
+
+
+async def _transcribe_saved_audio(file_location, digest):
+    key = transcription_key(digest)
+    cached = await io_pool.run(result_cache.get, key)
+    if cached is not None:
+        return cached
+    text, stats = await cpu_pool.run(transcribe_with_stats, file_location)
+    record_transcription(stats)
+    result = {"transcription": text}
+    await io_pool.run(result_cache.set, key, result)
+    return result
+
+# 2️⃣b Streaming transcription
+@app.websocket("/ws/transcribe")
+async def transcribe_websocket(websocket: WebSocket, format: str = "pcm16"):
+    """Live speech-to-text. Send audio as binary messages: raw 16 kHz mono
+    s16le PCM (format=pcm16) or container chunks such as MediaRecorder
+    webm/opus (format=webm). Each speech segment found by the VAD is
+    transcribed as soon as it ends and sent back as a "partial" message;
+    {"event": "end"} flushes the last segment and returns the "final"
+    transcript."""
+    await websocket.accept()
+    segmenter = SpeechSegmenter()
+    segments = asyncio.Queue()
+    texts = []
+    transcribed = 0
+
+    async def transcribe_segments():
+        nonlocal transcribed
+        # One segment at a time per connection keeps partials in order
+        while True:
+            samples = await segments.get()
+            if samples is None:
+                return
+            try:
+                text, stats = await cpu_pool.run(transcribe_segment, samples, " ".join(texts))
+            except Exception as e:
+                await websocket.send_json({"type": "error", "error": str(e)})
+                continue
+            record_transcription(stats)
+            if text:
+                texts.append(text)
+            await websocket.send_json({
+                "type": "partial",
+                "segment": transcribed,
+                "text": text,
+                "transcript": " ".join(texts)
+            })
+            transcribed += 1
+
+    def enqueue(completed):
+        for samples in completed:
+            segments.put_nowait(samples)
+
+    async def read_decoder(decoder):
+        while True:
+            pcm = await decoder.stdout.read(64 * 1024)
+            if not pcm:
+                return
+            enqueue(segmenter.feed_pcm16(pcm))
+
+    consumer = asyncio.ensure_future(transcribe_segments())
+    decoder = reader = None
+    if format != "pcm16":
+        decoder = await open_stream_decoder()
+        reader = asyncio.ensure_future(read_decoder(decoder))
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("bytes") is not None:
+                if decoder is not None:
+                    decoder.stdin.write(message["bytes"])
+                    await decoder.stdin.drain()
+                else:
+                    enqueue(segmenter.feed_pcm16(message["bytes"]))
+            elif message.get("text") is not None:
+                try:
+                    event = json.loads(message["text"]).get("event")
+                except (ValueError, AttributeError):
+                    event = None
+                if event == "end":
+                    if decoder is not None:
+                        decoder.stdin.close()
+                        await reader
+                        await decoder.wait()
+                    last = segmenter.flush()
+                    if last is not None:
+                        segments.put_nowait(last)
+                    segments.put_nowait(None)
+                    await consumer
+                    await websocket.send_json({"type": "final", "transcript": " ".join(texts)})
+                    await websocket.close()
+                    break
+    except WebSocketDisconnect:
+        pass
+    finally:
+        consumer.cancel()
+        if reader is not None:
+            reader.cancel()
+        if decoder is not None and decoder.returncode is None:
+            decoder.kill()
 
 # 3️⃣ CV summarization
 @app.post("/summarize_cv")
 async def summarize_cv_endpoint(file: UploadFile = File(...)):
     file_bytes = await file.read()
     if file.filename.endswith(".pdf"):
-        text = extract_text_from_pdf(file_bytes)
+        text = await cpu_pool.run(extract_text_from_pdf, file_bytes)
     elif file.filename.endswith(".docx"):
-        text = extract_text_from_docx(file_bytes)
+        text = await cpu_pool.run(extract_text_from_docx, file_bytes)
     else:
         text = file_bytes.decode("utf-8", errors="ignore")
     summary = summarize_cv(text)
     return {"summary": summary}
 
 # 4️⃣ Generate AI interview questions
+question_flight = SingleFlight("generate-questions")
+
 @app.post("/generate_questions")
 async def generate_questions_endpoint(summary: str = Form(...), api_key: str = Form(...), num_questions: int = Form(4)):
-    questions = generate_questions_with_ai(summary, api_key, num_questions)
-    return {"questions": questions}
+    # Identical concurrent requests (same CV template, double clicks) share one LLM call
+    key = make_key("questions", summary, num_questions, api_key)
+    try:
+        questions_text = await question_flight.do_async(key, lambda: io_pool.run(
+            chat_completion, question_messages(summary, num_questions), api_key, temperature=0.7, max_tokens=500
+        ))
+        questions = parse_questions(questions_text)
+    except LLMError as e:
+        logging.warning(f"AI question generation failed, using fallback questions: {e}")
+        questions = []
+    if len(questions) < num_questions:
+        fallback = generate_questions_fallback(summary, num_questions)
+        questions.extend(fallback[len(questions):])
+    return {"questions": questions[:num_questions]}
 
 # 5️⃣ Chat with AI about CV
 @app.post("/chat_with_ai")
@@ -119,23 +426,234 @@ async def chat_with_ai_endpoint(
     api_key: str = Form(...)
 ):
     history = json.loads(conversation_history)
-    answer, error = chat_with_ai(message, cv_summary, history, api_key)
-    if error:
-        return {"error": error}
+    try:
+        answer = await io_pool.run(chat_completion, interviewer_messages(message, cv_summary, history), api_key)
+    except LLMError as e:
+        return {"error": str(e)}
     return {"answer": answer}
 
+# 5️⃣b Streaming chat (Server-Sent Events)
+@app.post("/chat_with_ai/stream")
+async def chat_with_ai_stream_endpoint(
+    message: str = Form(...),
+    cv_summary: str = Form(...),
+    conversation_history: str = Form(...),
+    api_key: str = Form(...)
+):
+    history = json.loads(conversation_history)
+    messages = interviewer_messages(message, cv_summary, history)
+    loop = asyncio.get_running_loop()
+    chunks = asyncio.Queue()
+    stopped = threading.Event()
+
+    def pump():
+        # Reads the upstream stream in an io_pool thread (one slot for the
+        # whole stream) and hands each chunk to the event loop
+        stream = stream_chat_completion(messages, api_key)
+        try:
+            for delta in stream:
+                if stopped.is_set():
+                    break
+                loop.call_soon_threadsafe(chunks.put_nowait, ("delta", delta))
+        except Exception as e:  # LLMError, or a connection dropped mid-stream
+            loop.call_soon_threadsafe(chunks.put_nowait, ("error", str(e)))
+        finally:
+            stream.close()
+            loop.call_soon_threadsafe(chunks.put_nowait, ("done", None))
+
+    # Admitted before the response starts, so a full pool answers 503 + Retry-After
+    io_pool.submit(pump)
+
+    async def events():
+        try:
+            while True:
+                kind, value = await chunks.get()
+                if kind == "delta":
+                    yield f"data: {json.dumps({'delta': value})}\n\n"
+                elif kind == "error":
+                    yield f"event: error\ndata: {json.dumps({'error': value})}\n\n"
+                else:
+                    break
+            yield "data: [DONE]\n\n"
+        finally:
+            stopped.set()  # Client gone: stop reading upstream
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # 6️⃣ Text-to-speech
 @app.post("/text_to_speech")
 async def text_to_speech_endpoint(text: str = Form(...)):
-    audio_bytes, error = tts_to_audio(text)
+    audio_bytes, error = await io_pool.run(speak, text)
     if error:
         return {"error": error}
     return StreamingResponse(BytesIO(audio_bytes), media_type="audio/mp3")
 
-# 7️⃣ Speech-to-text (microphone)
+# 7️⃣ Speech-to-text (server microphone; prefer /ws/transcribe)
 @app.get("/speech_to_text")
 async def speech_to_text_endpoint():
-    text, error = speech_to_text()
+    text, error = await io_pool.run(speech_to_text)
     if error:
         return {"error": error}
     return {"transcription": text}
+
+# 8️⃣b End-of-interview finalization
+FINALIZE_DEADLINE_SECONDS = float(os.environ.get("FINALIZE_DEADLINE_SECONDS", "30"))
+FINALIZE_MAX_DEADLINE_SECONDS = float(os.environ.get("FINALIZE_MAX_DEADLINE_SECONDS", "120"))
+
+
+async def _timed(coro):
+    started = time.perf_counter()
+    result = await coro
+    return result, round(time.perf_counter() - started, 3)
+
+
+def _consume_result(task):
+    # Stages left running past the deadline finish in the background; their
+    # errors are logged here instead of "exception was never retrieved"
+    if not task.cancelled() and task.exception() is not None:
+        logging.warning(f"Finalization stage failed after the deadline: {task.exception()}")
+
+
+@app.post("/finalize_interview")
+async def finalize_interview_endpoint(
+    questions: str = Form("[]"),
+    responses: str = Form("[]"),
+    api_key: str = Form(""),
+    facial_result: str = Form(""),
+    video: Optional[UploadFile] = File(None),
+    audio: Optional[UploadFile] = File(None),
+    every_seconds: Optional[float] = Form(None),
+    parallel: int = Form(1),
+    deadline_seconds: Optional[float] = Form(None)
+):
+    """Run the end-of-interview stages concurrently under one deadline:
+    scoring (LLM), emotion analysis of `video`, transcription of `audio`
+    and written feedback. Each stage reports its status ("ok", "error",
+    "timeout" or "skipped") and its duration; stages that miss the deadline
+    keep running in the background and the media ones land in the result
+    cache, so a retry picks them up. Feedback uses the emotion summary (and
+    the transcription when no `responses` are sent), waiting for them when
+    they are running. The uploads are saved before the deadline starts."""
+    try:
+        questions_list = json.loads(questions)
+        responses_list = json.loads(responses)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"questions/responses must be JSON lists: {e}")
+    try:
+        interval = sample_interval(every_seconds=every_seconds)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    deadline = min(deadline_seconds or FINALIZE_DEADLINE_SECONDS, FINALIZE_MAX_DEADLINE_SECONDS)
+    started = time.perf_counter()
+    # Uploads are saved before the deadline starts: FastAPI closes them once
+    # the response is sent, and a stage still copying one then would fail
+    # and leave a .part file behind
+    saved_video = await save_upload(video, "videos") if video is not None else None
+    saved_audio = await save_upload(audio, "audios") if audio is not None else None
+
+    async def scoring():
+        evaluation = await io_pool.run(
+            chat_completion, scoring_messages(questions_list, responses_list), api_key, temperature=0.3, max_tokens=300
+        )
+        score, feedback = parse_evaluation(evaluation)
+        return {"score": score, "feedback": feedback}
+
+    async def emotions():
+        file_location, digest = saved_video
+        return await _analyze_saved_video(file_location, digest, interval, parallel)
+
+    async def transcription():
+        file_location, digest = saved_audio
+        return await _transcribe_saved_audio(file_location, digest)
+
+    async def upstream(name):
+        # Result of another stage, or None if it is skipped or failed
+        if name not in tasks:
+            return None
+        try:
+            return (await asyncio.shield(tasks[name]))[0]
+        except Exception:
+            return None
+
+    async def feedback():
+        facial = facial_result or json.dumps(await upstream("emotions") or {})
+        answer = "\n".join(str(r) for r in responses_list)
+        if not answer:
+            answer = ((await upstream("transcription")) or {}).get("transcription", "")
+        return {"feedback": await io_pool.run(generate_feedback, "\n".join(map(str, questions_list)), answer, facial)}
+
+    stages = {
+        "scoring": scoring if api_key and responses_list else None,
+        "emotions": emotions if video is not None else None,
+        "transcription": transcription if audio is not None else None,
+        "feedback": feedback if responses_list or audio is not None else None
+    }
+    tasks = {name: asyncio.ensure_future(_timed(stage())) for name, stage in stages.items() if stage}
+    if tasks:
+        await asyncio.wait(tasks.values(), timeout=deadline)
+
+    results = {}
+    for name, stage in stages.items():
+        task = tasks.get(name)
+        if task is None:
+            results[name] = {"status": "skipped"}
+        elif not task.done():
+            task.add_done_callback(_consume_result)
+            results[name] = {"status": "timeout", "seconds": round(time.perf_counter() - started, 3)}
+        elif task.exception() is not None:
+            error = task.exception()
+            results[name] = {"status": "error", "error": str(error) or type(error).__name__}
+        else:
+            result, seconds = task.result()
+            results[name] = {"status": "ok", "seconds": seconds, "result": result}
+    return {
+        "complete": all(r["status"] in ("ok", "skipped") for r in results.values()),
+        "deadline_seconds": deadline,
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+        "stages": results
+    }
+
+# 9️⃣ Service metrics
+@app.get("/metrics")
+async def metrics_endpoint():
+    return {
+        "llm": llm_client.get_metrics(),
+        "chat_context": chat_context.get_metrics(),
+        "tts_cache": audio_cache.stats(),
+        "result_cache": result_cache.stats(),
+        "question_singleflight": question_flight.stats(),
+        "executors": {"cpu": cpu_pool.stats(), "io": io_pool.stats()},
+        "event_loop_lag": loop_lag.stats(),
+        "transcription": audio_transcribe.get_metrics()
+    }
+
+# 🔟 Readiness and model warmup
+@app.get("/ready")
+async def ready_endpoint():
+    ready = _workers_ready()
+    if not ready and WARMUP_MODELS:
+        _start_warmup()  # Workers not started yet (busy or restarted pool) are started now
+    return {
+        "ready": ready,
+        "startup_seconds": STARTUP_SECONDS,
+        "workers": worker_models,
+        "models": registry.status()
+    }
+
+
+@app.post("/warmup")
+async def warmup_endpoint(models: str = Form("")):
+    # Starts every CPU worker with the models loaded; running workers were
+    # started without models new to the list, so those take a fresh pool
+    names = [name.strip() for name in models.split(",") if name.strip()] or WARMUP_MODELS
+    if add_worker_models(names):
+        cpu_pool.recycle()
+    return {"workers": await _warm_cpu_pool()}
+
+
+STARTUP_SECONDS = round(time.perf_counter() - _import_started, 3)
+logging.info(f"Backend imported in {STARTUP_SECONDS}s; models: {registry.status()}")
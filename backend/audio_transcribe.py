@@ -1,11 +1,96 @@
+import asyncio
 import os
-import whisper
-import tempfile
+import subprocess
+import threading
+import time
+from collections import deque
 
-# ✅ Load Whisper model once at startup
-print("Loading Whisper model...")
-model = whisper.load_model("small")  # You can also try "medium" or "large" for better accuracy
-print("Whisper model loaded!")
+import numpy as np
+
+from model_registry import registry
+
+WHISPER_MODEL = os.environ.get("WHISPER_MODEL", "small")  # You can also try "medium" or "large" for better accuracy
+WHISPER_TASK = "translate"  # ✅ ensures output is English text
+WHISPER_LANGUAGE = "en"     # ✅ forces English mode
+
+SAMPLE_RATE = 16000  # Whisper expects 16 kHz mono
+FRAME_SECONDS = 0.03
+SILENCE_THRESHOLD_DB = float(os.environ.get("SILENCE_THRESHOLD_DB", "-40"))  # Relative to the loudest frame
+SILENCE_PADDING_SECONDS = 0.2  # Kept around speech so word edges are not clipped
+
+
+def _load_whisper():
+    import whisper
+    return whisper.load_model(WHISPER_MODEL)
+
+
+# ✅ Whisper is loaded once, on first use (or registry warmup), not at import
+registry.register("whisper", _load_whisper)
+
+
+def decode_audio(file_path: str) -> np.ndarray:
+    """
+    Decode any ffmpeg-readable file to a 16 kHz mono float32 buffer
+    through a pipe (no temporary WAV on disk)
+    """
+    command = [
+        "ffmpeg", "-nostdin", "-threads", "0", "-i", file_path,
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE), "-"
+    ]
+    try:
+        process = subprocess.run(command, capture_output=True, check=True)
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to decode audio: {e.stderr.decode(errors='ignore')[-500:]}") from e
+    return np.frombuffer(process.stdout, np.int16).astype(np.float32) / 32768.0
+
+
+def trim_silence(audio: np.ndarray, threshold_db: float = SILENCE_THRESHOLD_DB) -> np.ndarray:
+    """
+    Drop leading and trailing frames whose energy is `threshold_db` below
+    the loudest frame. Returns an empty buffer when there is no speech.
+    """
+    frame = int(SAMPLE_RATE * FRAME_SECONDS)
+    n_frames = len(audio) // frame
+    if n_frames == 0:
+        return audio
+    frames = audio[:n_frames * frame].reshape(n_frames, frame)
+    rms = np.sqrt(np.mean(frames ** 2, axis=1))
+    peak = rms.max()
+    if peak <= 1e-4:  # Digital silence
+        return audio[:0]
+    voiced = np.flatnonzero(rms >= peak * 10 ** (threshold_db / 20))
+    padding = int(SAMPLE_RATE * SILENCE_PADDING_SECONDS)
+    start = max(0, voiced[0] * frame - padding)
+    end = min(len(audio), (voiced[-1] + 1) * frame + padding)
+    return audio[start:end]
+
+
+def transcribe_with_stats(file_path: str):
+    """
+    Transcribe `file_path` and return (text, stats) where stats holds the
+    decoded and trimmed audio durations and the wall time spent
+    """
+    started = time.perf_counter()
+    audio = decode_audio(file_path)
+    speech = trim_silence(audio)
+
+    text = ""
+    if len(speech):
+        # ✅ Transcribe audio and force English translation
+        model = registry.get("whisper")
+        result = model.transcribe(
+            speech,
+            task=WHISPER_TASK,
+            language=WHISPER_LANGUAGE
+        )
+        text = result["text"]
+
+    stats = {
+        "audio_seconds": len(audio) / SAMPLE_RATE,
+        "speech_seconds": len(speech) / SAMPLE_RATE,
+        "wall_seconds": time.perf_counter() - started
+    }
+    return text, stats
 
 
 def transcribe_audio(file_path: str) -> str:
@@ -13,26 +98,157 @@ def transcribe_audio(file_path: str) -> str:
     Transcribe an audio file using Whisper.
     Forces transcription to English output regardless of input language.
     """
+    text, stats = transcribe_with_stats(file_path)
+    record_transcription(stats)
+    return text
 
-    # ✅ Create a temporary file path (avoid overwriting input)
-    temp_wav = tempfile.mktemp(suffix=".wav", dir="audios")
 
-    # ✅ Convert to WAV (mono, 16kHz)
-    os.system(f"ffmpeg -y -i \"{file_path}\" -ar 16000 -ac 1 \"{temp_wav}\"")
+# ---------------- Streaming ---------------- #
 
-    # ✅ Transcribe audio and force English translation
+# Voice activity detection for live audio: a 30 ms frame louder than
+# VAD_THRESHOLD_DB (dBFS) is speech; a segment ends after
+# VAD_END_SILENCE_SECONDS of silence or at VAD_MAX_SEGMENT_SECONDS.
+VAD_THRESHOLD_DB = float(os.environ.get("VAD_THRESHOLD_DB", "-45"))
+VAD_END_SILENCE_SECONDS = float(os.environ.get("VAD_END_SILENCE_SECONDS", "0.6"))
+VAD_MAX_SEGMENT_SECONDS = float(os.environ.get("VAD_MAX_SEGMENT_SECONDS", "20"))
+VAD_MIN_SPEECH_SECONDS = 0.25
+
+
+class SpeechSegmenter:
+    """
+    Splits a live 16 kHz mono stream into speech segments. feed() returns
+    the segments completed by the new audio; flush() returns the one in
+    progress when the stream ends.
+    """
+
+    def __init__(self, threshold_db=VAD_THRESHOLD_DB, end_silence=VAD_END_SILENCE_SECONDS,
+                 max_segment=VAD_MAX_SEGMENT_SECONDS, min_speech=VAD_MIN_SPEECH_SECONDS):
+        self.frame = int(SAMPLE_RATE * FRAME_SECONDS)
+        self.threshold = 10 ** (threshold_db / 20)
+        self.end_silence_frames = max(1, int(end_silence / FRAME_SECONDS))
+        self.max_frames = max(1, int(max_segment / FRAME_SECONDS))
+        self.min_speech_frames = max(1, int(min_speech / FRAME_SECONDS))
+        self._remainder = np.empty(0, np.float32)
+        self._odd_byte = b""
+        self._preroll = deque(maxlen=max(1, int(SILENCE_PADDING_SECONDS / FRAME_SECONDS)))
+        self._segment = None
+        self._speech_frames = 0
+        self._silent_run = 0
+
+    def feed_pcm16(self, data: bytes):
+        """
+        feed() for raw little-endian 16-bit PCM that may be split mid-sample
+        """
+        data = self._odd_byte + data
+        cut = len(data) - len(data) % 2
+        self._odd_byte = data[cut:]
+        return self.feed(np.frombuffer(data[:cut], np.int16).astype(np.float32) / 32768.0)
+
+    def feed(self, samples: np.ndarray):
+        samples = np.concatenate([self._remainder, samples]) if len(self._remainder) else samples
+        n_frames = len(samples) // self.frame
+        self._remainder = samples[n_frames * self.frame:]
+        if n_frames == 0:
+            return []
+        frames = samples[:n_frames * self.frame].reshape(n_frames, self.frame)
+        voiced = np.sqrt(np.mean(frames ** 2, axis=1)) >= self.threshold
+
+        completed = []
+        for frame, speech in zip(frames, voiced):
+            if self._segment is None:
+                self._preroll.append(frame)
+                if speech:
+                    self._segment = list(self._preroll)
+                    self._preroll.clear()
+                    self._speech_frames = 1
+                    self._silent_run = 0
+                continue
+            self._segment.append(frame)
+            if speech:
+                self._speech_frames += 1
+                self._silent_run = 0
+            else:
+                self._silent_run += 1
+            if self._silent_run >= self.end_silence_frames or len(self._segment) >= self.max_frames:
+                segment = self._finish()
+                if segment is not None:
+                    completed.append(segment)
+        return completed
+
+    def flush(self):
+        return self._finish() if self._segment is not None else None
+
+    def _finish(self):
+        segment, speech_frames = self._segment, self._speech_frames
+        self._segment = None
+        self._speech_frames = 0
+        self._silent_run = 0
+        if speech_frames < self.min_speech_frames:
+            return None  # A click or a cough, not worth a Whisper call
+        return np.concatenate(segment)
+
+
+async def open_stream_decoder():
+    """
+    ffmpeg process turning a container stream (e.g. MediaRecorder webm/opus
+    chunks) written to stdin into 16 kHz s16le PCM on stdout
+    """
+    return await asyncio.create_subprocess_exec(
+        "ffmpeg", "-nostdin", "-loglevel", "error", "-i", "pipe:0",
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE), "pipe:1",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL
+    )
+
+
+def transcribe_segment(samples: np.ndarray, prompt: str = ""):
+    """
+    Transcribe one speech segment with the registry's Whisper model;
+    `prompt` (the transcript so far) keeps wording consistent across
+    segments. Returns (text, stats) like transcribe_with_stats.
+    """
+    started = time.perf_counter()
+    model = registry.get("whisper")
     result = model.transcribe(
-        temp_wav,
-        task="translate",      # ✅ ensures output is English text
-        language="en"          # ✅ forces English mode
+        samples,
+        task=WHISPER_TASK,
+        language=WHISPER_LANGUAGE,
+        initial_prompt=prompt[-200:] or None
     )
+    stats = {
+        "audio_seconds": len(samples) / SAMPLE_RATE,
+        "speech_seconds": len(samples) / SAMPLE_RATE,
+        "wall_seconds": time.perf_counter() - started
+    }
+    return result["text"].strip(), stats
 
-    text = result["text"]
 
-    # ✅ Clean up temporary file
-    try:
-        os.remove(temp_wav)
-    except Exception:
-        pass
+# ---------------- Metrics ---------------- #
 
-    return text
+_metrics = {"calls": 0, "audio_seconds": 0.0, "speech_seconds": 0.0, "wall_seconds": 0.0}
+_metrics_lock = threading.Lock()
+
+
+def record_transcription(stats):
+    """
+    Add one transcription's stats to this process's totals (the API records
+    here since transcription itself runs in worker processes)
+    """
+    with _metrics_lock:
+        _metrics["calls"] += 1
+        for key in ("audio_seconds", "speech_seconds", "wall_seconds"):
+            _metrics[key] += stats[key]
+
+
+def get_metrics():
+    with _metrics_lock:
+        metrics = dict(_metrics)
+    wall = metrics["wall_seconds"]
+    metrics["audio_seconds_per_wall_second"] = round(metrics["audio_seconds"] / wall, 2) if wall else 0.0
+    metrics["trimmed_ratio"] = (
+        round(1 - metrics["speech_seconds"] / metrics["audio_seconds"], 3) if metrics["audio_seconds"] else 0.0
+    )
+    for key in ("audio_seconds", "speech_seconds", "wall_seconds"):
+        metrics[key] = round(metrics[key], 3)
+    return metrics
@@ -0,0 +1,281 @@
+import asyncio
+import importlib
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+logger = logging.getLogger(__name__)
+
+CPU_WORKERS = int(os.environ.get("CPU_WORKERS", "2"))
+CPU_QUEUE = int(os.environ.get("CPU_QUEUE", "8"))
+IO_WORKERS = int(os.environ.get("IO_WORKERS", "16"))
+IO_QUEUE = int(os.environ.get("IO_QUEUE", "64"))
+RETRY_AFTER_SECONDS = int(os.environ.get("OVERLOAD_RETRY_AFTER", "5"))
+# How long start_workers waits for every worker to report ready (model loads included)
+WARMUP_TIMEOUT_SECONDS = float(os.environ.get("CPU_WARMUP_TIMEOUT", "600"))
+
+# Modules whose models are registered in (and used from) CPU workers
+WORKER_MODULES = ("audio_transcribe", "facial_emotion")
+
+
+class Overloaded(Exception):
+    """
+    Raised when a pool's queue is full; the API turns it into a 503
+    """
+
+    def __init__(self, pool_name, retry_after=RETRY_AFTER_SECONDS):
+        super().__init__(f"The {pool_name} worker pool is busy, retry later")
+        self.pool_name = pool_name
+        self.retry_after = retry_after
+
+
+class BoundedExecutor:
+    """
+    Executor wrapper that admits at most `workers + max_queue` jobs at once
+    and rejects the rest immediately instead of letting them pile up
+    """
+
+    def __init__(self, name, factory, workers, max_queue):
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue
+        self._factory = factory
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._in_flight = 0
+        self._ready = {}  # pid -> status reported by the worker's initializer
+        self.restarts = 0
+        self._stats = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0}
+        self._stats_lock = threading.Lock()
+
+    def _get_executor(self, broken=None):
+        # Pools start on first use so importing the app never forks/spawns.
+        # A pool whose worker died (e.g. OOM during inference) is replaced.
+        if self._executor is None or self._executor is broken:
+            with self._executor_lock:
+                if self._executor is None or self._executor is broken:
+                    if broken is not None:
+                        logger.warning("Restarting broken %s pool", self.name)
+                        broken.shutdown(wait=False, cancel_futures=True)
+                        self.restarts += 1
+                    self._executor = self._factory(self.workers)
+                    self._ready = {}
+        return self._executor
+
+    def recycle(self):
+        """
+        Replace the pool with a fresh one on next use; jobs already admitted
+        finish in the old one
+        """
+        with self._executor_lock:
+            old, self._executor = self._executor, None
+            if old is not None:
+                old.shutdown(wait=False)
+                self.restarts += 1
+
+    def _submit(self, job):
+        executor = self._get_executor()
+        try:
+            return executor.submit(job)
+        except BrokenExecutor:
+            return self._get_executor(broken=executor).submit(job)
+
+    def _done(self, future):
+        self._slots.release()
+        with self._stats_lock:
+            self._in_flight -= 1
+            self._stats["failed" if future.exception() else "completed"] += 1
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Admit `fn(*args, **kwargs)` now (Overloaded if the queue is full) and
+        return an awaitable for its result; for callers that must know they
+        were admitted before awaiting, e.g. before starting a response
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._stats_lock:
+                self._stats["rejected"] += 1
+            raise Overloaded(self.name)
+        try:
+            future = self._submit(partial(fn, *args, **kwargs))
+        except Exception:
+            self._slots.release()
+            raise
+        with self._stats_lock:
+            self._in_flight += 1
+            self._stats["submitted"] += 1
+        # The slot is released when the job finishes, even if the caller
+        # stops waiting (client disconnect), since the work keeps running
+        future.add_done_callback(self._done)
+        return asyncio.wrap_future(future)
+
+    async def run(self, fn, *args, **kwargs):
+        """
+        Run `fn(*args, **kwargs)` in the pool and await its result
+        """
+        return await self.submit(fn, *args, **kwargs)
+
+    async def start_workers(self, timeout=WARMUP_TIMEOUT_SECONDS):
+        """
+        Start every worker now rather than on demand and wait (up to
+        `timeout`) until each has run its initializer; returns {pid: status}
+        as reported by the workers so far. Pools whose workers do not report
+        (threads) return {}.
+        """
+        executor = self._get_executor()
+        ready = self._ready
+        reports = getattr(executor, "reports", None)
+        if reports is None:
+            return {}
+        # Process pools start a worker for each job that finds none idle
+        failed = threading.Event()
+        for _ in range(self.workers - len(ready)):
+            try:
+                job = self.submit(os.getpid)
+            except Overloaded:
+                # Busy: the rest start with the queued jobs; report what is ready now
+                timeout = 0
+                break
+            job.add_done_callback(lambda job: job.exception() and failed.set())
+        return await asyncio.to_thread(self._collect_reports, executor, ready, failed, timeout)
+
+    def _collect_reports(self, executor, ready, failed, timeout):
+        deadline = time.monotonic() + timeout
+        while len(ready) < self.workers and executor is self._executor and not failed.is_set():
+            remaining = deadline - time.monotonic()
+            try:
+                pid, status = executor.reports.get(timeout=max(0.0, min(remaining, 1.0)))
+            except queue.Empty:
+                if remaining <= 0:
+                    break
+                continue  # Also notices a pool replaced or broken meanwhile
+            ready[pid] = status
+        if timeout and len(ready) < self.workers:
+            logger.warning("%d of %d %s workers ready", len(ready), self.workers, self.name)
+        return dict(ready)
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = self._in_flight
+        stats["workers"] = self.workers
+        stats["max_queue"] = self.max_queue
+        return stats
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Models CPU workers load in their initializer (default: WARMUP_MODELS)
+_worker_models = None
+
+
+def worker_models():
+    global _worker_models
+    if _worker_models is None:
+        from model_registry import models_from_env
+        _worker_models = models_from_env()
+    return list(_worker_models)
+
+
+def add_worker_models(names):
+    """
+    Have workers started from now on also load `names`; returns True when
+    the list changed, i.e. running workers do not have them
+    """
+    global _worker_models
+    missing = [name for name in names if name not in worker_models()]
+    _worker_models = worker_models() + missing
+    return bool(missing)
+
+
+def warm_worker(models=(), reports=None):
+    """
+    Register the worker's models and load `models` in this process, then
+    report (pid, status) on `reports`. Runs as the CPU pool initializer, so
+    every worker starts warm.
+    """
+    for module in WORKER_MODULES:
+        try:
+            importlib.import_module(module)
+        except ImportError as e:
+            logger.warning("CPU worker could not import %s: %s", module, e)
+    from model_registry import registry
+    status = registry.warmup(list(models)) if models else registry.status()
+    if reports is not None:
+        reports.put((os.getpid(), status))
+    return status
+
+
+def _process_pool(workers):
+    # "spawn" keeps workers clean of the server's threads and event loop
+    context = multiprocessing.get_context(os.environ.get("CPU_START_METHOD", "spawn"))
+    reports = context.Queue()
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=warm_worker,
+        initargs=(worker_models(), reports)
+    )
+    pool.reports = reports
+    return pool
+
+
+def _thread_pool(workers):
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="io")
+
+
+# CPU-bound inference (Whisper, DeepFace, PDF parsing) runs in processes;
+# blocking network/file calls run in threads.
+cpu_pool = BoundedExecutor("cpu", _process_pool, CPU_WORKERS, CPU_QUEUE)
+io_pool = BoundedExecutor("io", _thread_pool, IO_WORKERS, IO_QUEUE)
+
+
+class LoopLagMonitor:
+    """
+    Measures how late the event loop wakes up from a fixed sleep; sustained
+    lag means something is blocking the loop
+    """
+
+    def __init__(self, interval=0.5):
+        self.interval = interval
+        self.last = 0.0
+        self.max = 0.0
+        self.avg = 0.0
+        self.samples = 0
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started - self.interval)
+            self.last = lag
+            self.max = max(self.max, lag)
+            self.samples += 1
+            self.avg += (lag - self.avg) * 0.1  # Exponential moving average
+            if lag > 1.0:
+                logger.warning("Event loop lagged %.2fs", lag)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stats(self):
+        return {
+            "last_ms": round(self.last * 1000, 2),
+            "avg_ms": round(self.avg * 1000, 2),
+            "max_ms": round(self.max * 1000, 2),
+            "samples": self.samples,
+        }
+
+
+loop_lag = LoopLagMonitor(float(os.environ.get("LOOP_LAG_INTERVAL", "0.5")))
@@ -1,36 +1,188 @@
-from deepface import DeepFace
+import math
+import os
+
 import cv2
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 
-def analyze_facial_emotions(video_path):
+from model_registry import registry
+
+
+def _load_deepface():
+    from deepface import DeepFace
+    # Build the emotion model up front so the first analysis isn't slow
+    try:
+        DeepFace.build_model(model_name="Emotion", task="facial_attribute")
+    except TypeError:
+        DeepFace.build_model("Emotion")
+    return DeepFace
+
+
+# ✅ DeepFace (and TensorFlow) load on first use, not at import
+registry.register("deepface", _load_deepface)
+
+# Face detector used before emotion classification ("opencv" is DeepFace's default)
+DETECTOR_BACKEND = os.environ.get("FACE_DETECTOR_BACKEND", "opencv")
+
+# Sampling: one frame every FACE_SAMPLE_SECONDS unless the request says otherwise
+DEFAULT_SAMPLE_SECONDS = float(os.environ.get("FACE_SAMPLE_SECONDS", "1.0"))
+FALLBACK_FPS = 30.0  # Used when the container reports no (or a nonsensical) frame rate
+MAX_FPS = 240.0
+# Sampling gaps of at least this many frames seek instead of grabbing through
+SEEK_MIN_FRAMES = int(os.environ.get("FACE_SEEK_MIN_FRAMES", "300"))
+
+
+def video_fps(cap):
+    """
+    Frame rate reported by the container, or FALLBACK_FPS when it is 0,
+    NaN or implausible (common for webm recordings from browsers)
+    """
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    if not math.isfinite(fps) or fps <= 0 or fps > MAX_FPS:
+        return FALLBACK_FPS
+    return fps
+
+
+def sample_interval(sample_fps=None, every_seconds=None):
+    """
+    Seconds between analyzed frames, from either a rate or a period
+    """
+    if sample_fps:
+        if sample_fps <= 0:
+            raise ValueError("sample_fps must be positive")
+        return 1.0 / sample_fps
+    if every_seconds:
+        if every_seconds <= 0:
+            raise ValueError("every_seconds must be positive")
+        return every_seconds
+    return DEFAULT_SAMPLE_SECONDS
+
+
+def _seek(cap, target):
+    """
+    Seek `cap` to frame `target` and return the frame it really is at:
+    some backends land on a nearby keyframe instead. None when the stream
+    cannot seek (the position is then unchanged).
+    """
+    if not cap.set(cv2.CAP_PROP_POS_FRAMES, target):
+        return None
+    position = cap.get(cv2.CAP_PROP_POS_FRAMES)
+    return int(round(position)) if position is not None and position >= 0 else target
+
+
+def _advance(cap, position, target):
+    """
+    Move from frame `position` to `target`: seek, then grab through any
+    frames left when the seek landed short. Returns the frame reached
+    (past `target` when the seek overshot), or None at the end of the stream.
+    """
+    reached = _seek(cap, target)
+    if reached is None:
+        reached = position
+    while reached < target:
+        if not cap.grab():
+            return None
+        reached += 1
+    return reached
+
+
+def iter_sampled_frames(cap, fps, interval_seconds, start_frame=0, end_frame=None):
+    """
+    Yield (frame_id, frame) for one frame every `interval_seconds`, from
+    `start_frame` up to (not including) `end_frame`.
+    Skipped frames are only grabbed (demuxed, never decoded to BGR); long
+    gaps seek directly when the stream supports it, and frame ids follow
+    the position the capture reports after each seek.
+    """
+    step = max(1, int(round(fps * interval_seconds)))
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+    seek = step >= SEEK_MIN_FRAMES and frame_count > 0
+    frame_id = _advance(cap, 0, start_frame) if start_frame else 0
+    while frame_id is not None and (end_frame is None or frame_id < end_frame):
+        if not cap.grab():
+            return
+        ok, frame = cap.retrieve()
+        if not ok:
+            return
+        yield frame_id, frame
+
+        target = frame_id + step
+        if end_frame is not None and target >= end_frame:
+            return
+        if seek and target < frame_count:
+            frame_id = _advance(cap, frame_id + 1, target)
+            continue
+        for _ in range(step - 1):
+            if not cap.grab():
+                return
+        frame_id = target
+
+
+def analyze_range(video_path, interval, start_frame=0, end_frame=None):
+    """
+    Timeline entries for the sampled frames in [start_frame, end_frame),
+    using this process's own capture handle and DeepFace model
+    """
+    DeepFace = registry.get("deepface")
     cap = cv2.VideoCapture(video_path)
-    fps = int(cap.get(cv2.CAP_PROP_FPS))
-    frame_interval = fps * 1  # analyze 1 frame every second
-    frame_id = 0
+    fps = video_fps(cap)
     results = []
 
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-        if frame_id % frame_interval == 0:
+    try:
+        for frame_id, frame in iter_sampled_frames(cap, fps, interval, start_frame, end_frame):
             try:
-                analysis = DeepFace.analyze(frame, actions=['emotion'], enforce_detection=False)
+                analysis = DeepFace.analyze(frame, actions=['emotion'], enforce_detection=False, detector_backend=DETECTOR_BACKEND)
                 emotion = analysis[0]['dominant_emotion']
                 timestamp = int(frame_id / fps)
                 results.append({"second": timestamp, "emotion": emotion})
             except:
                 pass
-        frame_id += 1
+    finally:
+        cap.release()
+    return results
+
+
+def plan_ranges(video_path, interval, parts):
+    """
+    Split a video into up to `parts` frame ranges that start on the
+    sampling grid, so the ranges together sample exactly the frames a
+    sequential pass would. Returns [(start_frame, end_frame)], or a single
+    open range when the frame count is unknown.
+    """
+    cap = cv2.VideoCapture(video_path)
+    try:
+        fps = video_fps(cap)
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+    finally:
+        cap.release()
+    step = max(1, int(round(fps * interval)))
+    samples = math.ceil(frame_count / step) if frame_count > 0 else 0
+    parts = max(1, min(parts, samples))
+    if samples == 0 or parts == 1:
+        return [(0, None)]
+    bounds = [round(samples * i / parts) * step for i in range(parts + 1)]
+    bounds[-1] = None  # The last range runs to the end, whatever the real length
+    return list(zip(bounds[:-1], bounds[1:]))
 
-    cap.release()
 
+def merge_timelines(range_results):
+    """
+    Concatenate per-range timelines back into chronological order
+    """
+    return sorted((entry for results in range_results for entry in results), key=lambda r: r["second"])
+
+
+def summarize_timeline(results):
+    """
+    The analysis output (dominant emotion, emotion shares, timeline) for a
+    list of {"second", "emotion"} entries
+    """
     # summarize emotions
     emotion_counts = Counter([r["emotion"] for r in results])
     total = sum(emotion_counts.values())
     summary = {k: round(v / total, 2) for k, v in emotion_counts.items()}
-    dominant = max(summary, key=summary.get)
+    dominant = max(summary, key=summary.get) if summary else None
 
     output = {
         "dominant_emotion": dominant,
@@ -42,3 +194,71 @@ def analyze_facial_emotions(video_path):
     return output
 
 
+def analyze_frame_bytes(image_bytes):
+    """
+    Dominant emotion in one encoded (JPEG/PNG) frame, or None when the
+    frame cannot be decoded or analyzed
+    """
+    frame = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        return None
+    DeepFace = registry.get("deepface")
+    try:
+        analysis = DeepFace.analyze(frame, actions=['emotion'], enforce_detection=False, detector_backend=DETECTOR_BACKEND)
+        return analysis[0]['dominant_emotion']
+    except:
+        return None
+
+
+class EmotionAggregate:
+    """
+    Online emotion counts for a live stream of frames; summary() gives the
+    same output as analyze_facial_emotions
+    """
+
+    def __init__(self):
+        self.counts = Counter()
+        self.timeline = []
+
+    def add(self, second, emotion):
+        self.counts[emotion] += 1
+        self.timeline.append({"second": int(second), "emotion": emotion})
+
+    def snapshot(self):
+        total = sum(self.counts.values())
+        return {
+            "frames": total,
+            "counts": dict(self.counts),
+            "dominant_emotion": self.counts.most_common(1)[0][0] if total else None
+        }
+
+    def summary(self):
+        return summarize_timeline(self.timeline)
+
+
+def analyze_facial_emotions(video_path, sample_fps=None, every_seconds=None):
+    interval = sample_interval(sample_fps, every_seconds)
+    return summarize_timeline(analyze_range(video_path, interval))
+
+
+def analyze_facial_emotions_parallel(video_path, workers=None, sample_fps=None, every_seconds=None, executor=None):
+    """
+    Same output as analyze_facial_emotions, with the video split into time
+    ranges analyzed by separate worker processes (each loads its own model).
+    Pass `executor` to reuse an existing process pool.
+    """
+    interval = sample_interval(sample_fps, every_seconds)
+    workers = workers or os.cpu_count() or 1
+    ranges = plan_ranges(video_path, interval, workers)
+    if len(ranges) == 1:
+        return summarize_timeline(analyze_range(video_path, interval))
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=min(workers, len(ranges)))
+    try:
+        futures = [executor.submit(analyze_range, video_path, interval, start, end) for start, end in ranges]
+        return summarize_timeline(merge_timelines(future.result() for future in futures))
+    finally:
+        if own_executor:
+            executor.shutdown()
@@ -0,0 +1,139 @@
+import bisect
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+QUESTION_BANK_PATH = os.environ.get(
+    "QUESTION_BANK_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "question_bank.json")
+)
+# How often (seconds) a request may stat the file to look for changes
+RELOAD_CHECK_SECONDS = float(os.environ.get("QUESTION_BANK_RELOAD_CHECK", "2"))
+# Earlier bank versions kept in memory to grade quizzes generated before a reload
+KEEP_VERSIONS = 4
+
+
+class BankSnapshot:
+    """
+    One immutable load of the bank: per-skill question tuples, an id index
+    and the skill weights. Readers keep using the snapshot they got even
+    if a reload swaps in a new one.
+    """
+
+    def __init__(self, data, mtime=None):
+        self.version = data["version"]
+        self.mtime = mtime
+        self.by_skill = {}
+        self.weights = {}
+        self.by_id = {}
+        for skill, entry in data["skills"].items():
+            questions = tuple(entry["questions"])
+            for question in questions:
+                if question["id"] in self.by_id:
+                    raise ValueError(f"Duplicate question id '{question['id']}'")
+                self.by_id[question["id"]] = question
+            self.by_skill[skill.lower()] = questions
+            self.weights[skill.lower()] = float(entry.get("weight", 1.0))
+
+    @property
+    def skills(self):
+        return list(self.by_skill)
+
+    def sample(self, skills, k=10, seed=None):
+        """
+        Up to `k` distinct questions for `skills`: each draw picks a skill
+        in proportion to its weight, then an unused question of that skill.
+        Costs O(k) draws regardless of bank size; the same seed, skills and
+        bank version always give the same quiz.
+        """
+        rng = random.Random(seed)
+        pool = [s for s in dict.fromkeys(skill.lower() for skill in skills) if s in self.by_skill]
+        remaining = {skill: len(self.by_skill[skill]) for skill in pool}
+        swapped = {skill: {} for skill in pool}  # Sparse Fisher-Yates state per skill
+        cumulative = self._cumulative(pool)
+        picked = []
+
+        while len(picked) < k and pool:
+            index = bisect.bisect_right(cumulative, rng.random() * cumulative[-1])
+            skill = pool[min(index, len(pool) - 1)]
+            n = remaining[skill]
+            j = rng.randrange(n)
+            moved = swapped[skill]
+            picked.append(self.by_skill[skill][moved.get(j, j)])
+            moved[j] = moved.get(n - 1, n - 1)
+            remaining[skill] = n - 1
+            if n == 1:  # Skill exhausted
+                pool.remove(skill)
+                cumulative = self._cumulative(pool)
+        return picked
+
+    def _cumulative(self, pool):
+        total, cumulative = 0.0, []
+        for skill in pool:
+            total += self.weights[skill]
+            cumulative.append(total)
+        return cumulative
+
+
+class QuestionBank:
+    """
+    The versioned question bank file, loaded once and reloaded when its
+    mtime changes (checked at most every `check_interval` seconds)
+    """
+
+    def __init__(self, path=QUESTION_BANK_PATH, check_interval=RELOAD_CHECK_SECONDS):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._snapshot = self._load()
+        self._history = OrderedDict([(self._snapshot.version, self._snapshot)])
+        self._checked_at = time.monotonic()
+
+    def _load(self):
+        mtime = os.stat(self.path).st_mtime_ns
+        with open(self.path, encoding="utf-8") as f:
+            snapshot = BankSnapshot(json.load(f), mtime)
+        logger.info("Loaded question bank v%s (%d skills, %d questions)",
+                    snapshot.version, len(snapshot.by_skill), len(snapshot.by_id))
+        return snapshot
+
+    def snapshot(self):
+        """
+        Current bank, reloading first if the file changed
+        """
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            with self._lock:
+                if now - self._checked_at >= self.check_interval:
+                    self._checked_at = now
+                    self._reload_if_changed()
+        return self._snapshot
+
+    def snapshot_for(self, version):
+        """
+        The bank at `version` if this process still has it, else the current one
+        """
+        current = self.snapshot()
+        return self._history.get(version, current)
+
+    def _reload_if_changed(self):
+        try:
+            if os.stat(self.path).st_mtime_ns == self._snapshot.mtime:
+                return
+            self._snapshot = self._load()
+            self._history[self._snapshot.version] = self._snapshot
+            self._history.move_to_end(self._snapshot.version)
+            while len(self._history) > KEEP_VERSIONS:
+                self._history.popitem(last=False)
+        except (OSError, ValueError, KeyError) as e:
+            # A half-written or broken file keeps the previous bank in service
+            logger.warning("Question bank reload failed, keeping v%s: %s", self._snapshot.version, e)
+
+
+question_bank = QuestionBank()
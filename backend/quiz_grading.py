@@ -0,0 +1,135 @@
+import numpy as np
+
+NO_ANSWER = -1
+INVALID_ANSWER = -2
+
+
+def answer_key(record, bank):
+    """
+    Expected answers of a stored quiz ({qid: meta}), read from the bank
+    version the quiz was generated with
+    """
+    snapshot = bank.snapshot_for(record["bank_version"])
+    answers_map = {}
+    for qid in record["question_ids"]:
+        q = snapshot.by_id.get(qid)
+        if q is None:
+            answers_map[qid] = {"type": "missing"}
+        elif q["type"] in ["mcq", "tf"]:
+            answers_map[qid] = {"type": q["type"], "answer_index": q.get("answer_index"),
+                                "n_options": len(q.get("options") or [])}
+        else:
+            answers_map[qid] = {"type": "short", "answer_text": q.get("answer_text", "").lower()}
+    return answers_map
+
+
+def _parse_index(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def _submitted_index(prov, qid, n_options):
+    """
+    Chosen option index, NO_ANSWER, or INVALID_ANSWER for anything that is
+    not an index into the question's options (so it fits the int64 arrays)
+    """
+    if qid not in prov:
+        return NO_ANSWER
+    index = _parse_index(prov[qid])
+    if index is None or not 0 <= index < n_options:
+        return INVALID_ANSWER
+    return index
+
+
+def _short_answer_correct(expected, submitted):
+    submitted_text = str(submitted).lower()
+    return expected in submitted_text or submitted_text in expected
+
+
+def grade_batch(records, submissions, bank, include_feedback=False):
+    """
+    Grade many quizzes at once. `records[i]` is the stored quiz (None when
+    unknown) and `submissions[i]` its list of {"id", "answer"}.
+
+    Choice questions of the whole batch are flattened into index arrays and
+    compared in one vectorized pass; scores are summed per submission with
+    a bincount. Returns (results, rows) where results[i] is
+    {"score", "total"[, "feedback"]} or None, and rows = (question_ids,
+    chosen options, correct flags) for the per-question statistics.
+    """
+    keys = {}  # Many candidates share a quiz on assessment days
+    owners, qids, expected, chosen = [], [], [], []
+    short_scores = np.zeros(len(records))
+    totals = [0] * len(records)
+    provs = [None] * len(records)
+
+    for i, (record, answers) in enumerate(zip(records, submissions)):
+        if record is None:
+            continue
+        cache_key = (record["bank_version"], tuple(record["question_ids"]))
+        if cache_key not in keys:
+            keys[cache_key] = answer_key(record, bank)
+        answers_map = keys[cache_key]
+        prov = {a["id"]: a.get("answer") for a in answers if isinstance(a, dict) and isinstance(a.get("id"), str)}
+        provs[i] = (answers_map, prov)
+        totals[i] = len(answers_map)
+        for qid, meta in answers_map.items():
+            if meta["type"] in ["mcq", "tf"]:
+                owners.append(i)
+                qids.append(qid)
+                expected.append(meta["answer_index"])
+                chosen.append(_submitted_index(prov, qid, meta["n_options"]))
+            elif meta["type"] == "short" and qid in prov:
+                short_scores[i] += _short_answer_correct(meta["answer_text"], prov[qid])
+
+    owners = np.asarray(owners, dtype=np.int64)
+    expected = np.asarray(expected, dtype=np.int64)
+    chosen = np.asarray(chosen, dtype=np.int64)
+    correct = (chosen >= 0) & (chosen == expected)
+    scores = np.bincount(owners, weights=correct, minlength=len(records)) + short_scores
+
+    results = []
+    for i, record in enumerate(records):
+        if record is None:
+            results.append(None)
+            continue
+        result = {"score": int(scores[i]), "total": totals[i]}
+        if include_feedback:
+            result["feedback"] = _feedback(*provs[i])
+        results.append(result)
+
+    options = np.where(chosen >= 0, chosen, NO_ANSWER)
+    return results, (qids, options, correct)
+
+
+def _feedback(answers_map, prov):
+    """
+    Per-question feedback in the /submit-quiz format
+    """
+    feedback = []
+    for qid, meta in answers_map.items():
+        if qid not in prov:
+            feedback.append({"id": qid, "correct": False, "reason":"no answer submitted"})
+            continue
+        submitted = prov[qid]
+        if meta["type"] == "missing":
+            feedback.append({"id": qid, "correct": False, "reason":"question no longer in the bank"})
+        elif meta["type"] in ["mcq", "tf"]:
+            submitted_index = _parse_index(submitted)
+            if submitted_index is None:
+                feedback.append({"id": qid, "correct": False, "reason":"invalid answer type"})
+                continue
+            correct_index = meta["answer_index"]
+            if not 0 <= submitted_index < meta["n_options"]:
+                feedback.append({"id": qid, "correct": False, "correct_index": correct_index,
+                                 "reason":"answer index out of range"})
+                continue
+            feedback.append({"id": qid, "correct": submitted_index == correct_index,
+                             "correct_index": correct_index, "submitted_index": submitted_index})
+        else:  # short answer
+            expected = meta["answer_text"]
+            feedback.append({"id": qid, "correct": _short_answer_correct(expected, submitted),
+                             "expected": expected, "submitted": str(submitted).lower()})
+    return feedback
@@ -0,0 +1,315 @@
+"""
+Storage for generated quizzes between /generate-quiz and /submit-quiz, and
+for the per-question statistics accumulated while grading.
+
+A quiz record only holds the bank version and the question ids (answers
+are looked up in the question bank at grading time), so records stay a
+few hundred bytes. Both kinds of state have two backends:
+
+- Memory*: per-process (single worker / demo)
+- SQLite*: a WAL-mode SQLite file shared by every worker on a host
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+QUIZ_STORE_BACKEND = os.environ.get("QUIZ_STORE_BACKEND", "memory")
+QUIZ_STORE_PATH = os.environ.get(
+    "QUIZ_STORE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "quizzes.sqlite3")
+)
+QUIZ_TTL_SECONDS = int(os.environ.get("QUIZ_TTL_SECONDS", str(2 * 3600)))
+QUIZ_STORE_MAX_ENTRIES = int(os.environ.get("QUIZ_STORE_MAX_ENTRIES", "10000"))
+
+
+class MemoryQuizStore:
+    """
+    Process-local store; the least recently used quizzes are evicted past
+    `max_entries`
+    """
+
+    def __init__(self, ttl=QUIZ_TTL_SECONDS, max_entries=QUIZ_STORE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # quiz_id -> (expires_at, record)
+        self._lock = threading.Lock()
+        self._stats = {"puts": 0, "hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+
+    def put(self, quiz_id, record):
+        with self._lock:
+            self._entries[quiz_id] = (time.time() + self.ttl, record)
+            self._entries.move_to_end(quiz_id)
+            self._stats["puts"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def get_many(self, quiz_ids):
+        return {quiz_id: self.get(quiz_id) for quiz_id in quiz_ids}
+
+    def get(self, quiz_id):
+        with self._lock:
+            entry = self._entries.get(quiz_id)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            expires_at, record = entry
+            if expires_at < time.time():
+                del self._entries[quiz_id]
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(quiz_id)
+            self._stats["hits"] += 1
+            return record
+
+    def delete(self, quiz_id):
+        with self._lock:
+            self._entries.pop(quiz_id, None)
+
+    def stats(self):
+        with self._lock:
+            return {"backend": "memory", "size": len(self._entries), **self._stats}
+
+
+class _SQLiteBase:
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _connection(self):
+        # One connection per thread (sqlite3 connections are not thread-safe)
+        # and per process, since a connection must not cross a fork
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+
+class SQLiteQuizStore(_SQLiteBase):
+    """
+    Store in a SQLite file in WAL mode, so every worker process on the host
+    reads and writes the same quizzes. Expired rows are purged every
+    `purge_every` puts; the row count is capped at `max_entries`.
+    """
+
+    def __init__(self, path=QUIZ_STORE_PATH, ttl=QUIZ_TTL_SECONDS, max_entries=QUIZ_STORE_MAX_ENTRIES,
+                 purge_every=200):
+        super().__init__(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.purge_every = purge_every
+        self._puts = 0
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS quizzes ("
+                " quiz_id TEXT PRIMARY KEY,"
+                " record TEXT NOT NULL,"
+                " expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS quizzes_expires ON quizzes (expires_at)")
+
+    def put(self, quiz_id, record):
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO quizzes (quiz_id, record, expires_at) VALUES (?, ?, ?)",
+                (quiz_id, json.dumps(record, separators=(",", ":")), time.time() + self.ttl)
+            )
+        self._puts += 1
+        if self._puts % self.purge_every == 0:
+            self.purge()
+
+    def get(self, quiz_id):
+        row = self._connection().execute(
+            "SELECT record FROM quizzes WHERE quiz_id = ? AND expires_at >= ?", (quiz_id, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_many(self, quiz_ids, chunk=500):
+        """
+        {quiz_id: record or None} in one query per `chunk` ids
+        """
+        found = dict.fromkeys(quiz_ids)
+        ids = list(found)
+        now = time.time()
+        conn = self._connection()
+        for start in range(0, len(ids), chunk):
+            part = ids[start:start + chunk]
+            rows = conn.execute(
+                f"SELECT quiz_id, record FROM quizzes WHERE quiz_id IN ({','.join('?' * len(part))})"
+                " AND expires_at >= ?", (*part, now)
+            )
+            for quiz_id, record in rows:
+                found[quiz_id] = json.loads(record)
+        return found
+
+    def delete(self, quiz_id):
+        with self._connection() as conn:
+            conn.execute("DELETE FROM quizzes WHERE quiz_id = ?", (quiz_id,))
+
+    def purge(self):
+        """
+        Drop expired quizzes, then the soonest-expiring ones past max_entries
+        """
+        with self._connection() as conn:
+            conn.execute("DELETE FROM quizzes WHERE expires_at < ?", (time.time(),))
+            conn.execute(
+                "DELETE FROM quizzes WHERE quiz_id IN ("
+                " SELECT quiz_id FROM quizzes ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def stats(self):
+        size = self._connection().execute("SELECT COUNT(*) FROM quizzes").fetchone()[0]
+        return {"backend": "sqlite", "path": self.path, "size": size}
+
+
+# ---------------- Per-question statistics ---------------- #
+
+def aggregate_answers(question_ids, options, correct):
+    """
+    Collapse graded answer rows into per-question increments.
+    `options` holds the chosen option index per row, already checked against
+    the question's option count (negative = skipped/invalid).
+    Returns ({qid: (attempts, correct, skipped)}, {(qid, option): count}).
+    """
+    question_ids = np.asarray(question_ids)
+    options = np.asarray(options, dtype=np.int64)
+    correct = np.asarray(correct, dtype=bool)
+    if question_ids.size == 0:
+        return {}, {}
+    qids, codes = np.unique(question_ids, return_inverse=True)
+    answered = options >= 0
+    n = len(qids)
+    attempts = np.bincount(codes[answered], minlength=n)
+    right = np.bincount(codes[answered & correct], minlength=n)
+    skipped = np.bincount(codes[~answered], minlength=n)
+    totals = {str(q): (int(a), int(c), int(k)) for q, a, c, k in zip(qids, attempts, right, skipped)}
+
+    if not answered.any():
+        return totals, {}
+    pairs, counts = np.unique(np.stack([codes[answered], options[answered]], axis=1), axis=0, return_counts=True)
+    distribution = {(str(qids[code]), int(option)): int(count) for (code, option), count in zip(pairs, counts)}
+    return totals, distribution
+
+
+def _item_summary(attempts, right, skipped, options):
+    return {
+        "attempts": attempts,
+        "correct": right,
+        "correct_rate": round(right / attempts, 4) if attempts else None,
+        "skipped": skipped,
+        "options": options
+    }
+
+
+class MemoryItemStats:
+    """
+    Running per-question aggregates (attempts, correct, skipped, option counts)
+    """
+
+    def __init__(self):
+        self._totals = {}   # qid -> [attempts, correct, skipped]
+        self._options = {}  # qid -> {option_index: count}
+        self._lock = threading.Lock()
+
+    def record(self, question_ids, options, correct):
+        totals, distribution = aggregate_answers(question_ids, options, correct)
+        with self._lock:
+            for qid, increments in totals.items():
+                current = self._totals.setdefault(qid, [0, 0, 0])
+                for i, value in enumerate(increments):
+                    current[i] += value
+            for (qid, option), count in distribution.items():
+                counts = self._options.setdefault(qid, {})
+                counts[option] = counts.get(option, 0) + count
+
+    def get(self, question_id=None):
+        with self._lock:
+            qids = [question_id] if question_id else list(self._totals)
+            return {
+                qid: _item_summary(*self._totals[qid], dict(sorted(self._options.get(qid, {}).items())))
+                for qid in qids if qid in self._totals
+            }
+
+
+class SQLiteItemStats(_SQLiteBase):
+    """
+    The same aggregates kept in the shared SQLite file; each graded batch is
+    applied as a handful of upsert increments
+    """
+
+    def __init__(self, path=QUIZ_STORE_PATH):
+        super().__init__(path)
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS item_stats ("
+                " question_id TEXT PRIMARY KEY,"
+                " attempts INTEGER NOT NULL, correct INTEGER NOT NULL, skipped INTEGER NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS item_options ("
+                " question_id TEXT NOT NULL, option_index INTEGER NOT NULL, count INTEGER NOT NULL,"
+                " PRIMARY KEY (question_id, option_index))"
+            )
+
+    def record(self, question_ids, options, correct):
+        totals, distribution = aggregate_answers(question_ids, options, correct)
+        if not totals:
+            return
+        with self._connection() as conn:
+            conn.executemany(
+                "INSERT INTO item_stats (question_id, attempts, correct, skipped) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT(question_id) DO UPDATE SET attempts = attempts + excluded.attempts,"
+                " correct = correct + excluded.correct, skipped = skipped + excluded.skipped",
+                [(qid, *increments) for qid, increments in totals.items()]
+            )
+            conn.executemany(
+                "INSERT INTO item_options (question_id, option_index, count) VALUES (?, ?, ?)"
+                " ON CONFLICT(question_id, option_index) DO UPDATE SET count = count + excluded.count",
+                [(qid, option, count) for (qid, option), count in distribution.items()]
+            )
+
+    def get(self, question_id=None):
+        conn = self._connection()
+        where, params = (" WHERE question_id = ?", (question_id,)) if question_id else ("", ())
+        options = {}
+        for qid, option, count in conn.execute(
+                "SELECT question_id, option_index, count FROM item_options" + where + " ORDER BY option_index",
+                params):
+            options.setdefault(qid, {})[option] = count
+        return {
+            qid: _item_summary(attempts, right, skipped, options.get(qid, {}))
+            for qid, attempts, right, skipped in conn.execute(
+                "SELECT question_id, attempts, correct, skipped FROM item_stats" + where, params)
+        }
+
+
+def store_from_env():
+    """
+    The store selected by QUIZ_STORE_BACKEND ("memory" or "sqlite")
+    """
+    if QUIZ_STORE_BACKEND == "sqlite":
+        return SQLiteQuizStore()
+    if QUIZ_STORE_BACKEND != "memory":
+        raise ValueError(f"Unknown QUIZ_STORE_BACKEND '{QUIZ_STORE_BACKEND}', expected 'memory' or 'sqlite'")
+    return MemoryQuizStore()
+
+
+def item_stats_from_env():
+    """
+    Per-question statistics kept next to the quizzes (QUIZ_STORE_BACKEND)
+    """
+    return SQLiteItemStats() if QUIZ_STORE_BACKEND == "sqlite" else MemoryItemStats()
@@ -0,0 +1,34 @@
+import os
+
+from cache_store import TwoTierCache, make_key
+from audio_transcribe import WHISPER_MODEL, WHISPER_TASK, WHISPER_LANGUAGE, SILENCE_THRESHOLD_DB
+from facial_emotion import DETECTOR_BACKEND
+
+# Bump when the shape of a cached result changes
+RESULT_VERSION = 1
+
+_CACHE_DIR = os.environ.get(
+    "RESULT_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "results")
+)
+
+# Transcriptions and emotion analyses keyed by the media's sha256 plus
+# every parameter that changes the output, so a re-uploaded recording is
+# answered from here. The disk tier is size-capped with LRU eviction.
+result_cache = TwoTierCache(
+    "media-results",
+    max_entries=int(os.environ.get("RESULT_CACHE_MAX_ENTRIES", "256")),
+    disk_dir=_CACHE_DIR or None,
+    disk_max_bytes=int(os.environ.get("RESULT_CACHE_DISK_MAX_BYTES", str(256 * 1024 * 1024)))
+)
+
+
+def transcription_key(media_digest):
+    return make_key(
+        "transcription", RESULT_VERSION, media_digest,
+        WHISPER_MODEL, WHISPER_TASK, WHISPER_LANGUAGE, SILENCE_THRESHOLD_DB
+    )
+
+
+def emotion_key(media_digest, interval_seconds):
+    return make_key("emotion", RESULT_VERSION, media_digest, float(interval_seconds), DETECTOR_BACKEND)
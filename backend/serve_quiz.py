@@ -0,0 +1,145 @@
+"""
+Production entry point for the quiz service (appp.py): preload, then fork.
+
+The parent process imports the app, loads the question bank, builds the
+skill matcher and the models listed in WARMUP_MODELS (e.g. spacy), then
+freezes the garbage collector and forks the workers. Workers accept on the
+same listening socket and share the preloaded pages copy-on-write; with
+the GC frozen, collections in a worker no longer write to (and so unshare)
+every object the parent loaded. A worker that dies is replaced.
+
+With more than one worker the quiz store defaults to sqlite, so a quiz can
+be submitted to any worker.
+
+    python serve_quiz.py --workers 4 --port 5000
+    WARMUP_MODELS=spacy SKILL_NER=1 python serve_quiz.py --workers 4
+"""
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+
+logger = logging.getLogger("serve_quiz")
+
+QUIZ_WORKERS = int(os.environ.get("QUIZ_WORKERS", str(os.cpu_count() or 1)))
+QUIZ_HOST = os.environ.get("QUIZ_HOST", "0.0.0.0")
+QUIZ_PORT = int(os.environ.get("QUIZ_PORT", "5000"))
+# 0: one request at a time per worker (like a sync gunicorn worker); 1: a thread per request
+QUIZ_THREADED = os.environ.get("QUIZ_THREADED", "0") == "1"
+# A worker that exits sooner than this after starting delays its replacement
+RESPAWN_BACKOFF_SECONDS = 1.0
+
+
+def preload():
+    """
+    Everything workers should inherit instead of loading themselves
+    """
+    started = time.perf_counter()
+    import appp
+
+    if appp.warmup_thread is not None:
+        appp.warmup_thread.join()  # A thread must not be mid-load at fork time
+    appp.current_skill_matcher()
+    logger.info("Preloaded quiz service in %.2fs (models: %s)", time.perf_counter() - started,
+                {name: status["loaded"] for name, status in appp.registry.status().items()})
+    return appp.app
+
+
+def serve_worker(app, listener, threaded):
+    from werkzeug.serving import make_server
+
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    host, port = listener.getsockname()[:2]
+    server = make_server(host, port, app, threaded=threaded, fd=listener.fileno())
+    server.serve_forever()
+
+
+def spawn(app, listener, threaded):
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            serve_worker(app, listener, threaded)
+        except BaseException:
+            logger.exception("Worker %d crashed", os.getpid())
+            code = 1
+        finally:
+            os._exit(code)
+    return pid
+
+
+def run(workers=QUIZ_WORKERS, host=QUIZ_HOST, port=QUIZ_PORT, threaded=QUIZ_THREADED,
+        freeze_gc=True, access_log=False):
+    if workers > 1:
+        os.environ.setdefault("QUIZ_STORE_BACKEND", "sqlite")
+        if os.environ["QUIZ_STORE_BACKEND"] == "memory":
+            logger.warning("QUIZ_STORE_BACKEND=memory with %d workers: a quiz can only be "
+                           "submitted to the worker that generated it", workers)
+    if not access_log:
+        logging.getLogger("werkzeug").setLevel(logging.WARNING)
+
+    app = preload()
+    listener = socket.create_server((host, port), backlog=128)
+    if freeze_gc:
+        # Move everything loaded so far to a permanent generation the
+        # collector never scans, so workers keep sharing those pages
+        gc.collect()
+        gc.freeze()
+        logger.info("Froze %d objects before forking", gc.get_freeze_count())
+
+    children = {}  # pid -> started_at
+    stopping = []
+
+    def stop(signum, frame):
+        if not stopping:
+            logger.info("Stopping %d workers", len(children))
+        stopping.append(signum)
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for _ in range(workers):
+        children[spawn(app, listener, threaded)] = time.monotonic()
+    logger.info("Serving on http://%s:%d with %d workers (pids %s)", host, port, workers, list(children))
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        started_at = children.pop(pid, None)
+        if started_at is None or stopping:
+            continue
+        logger.warning("Worker %d exited (code %d), starting a new one", pid, os.waitstatus_to_exitcode(status))
+        if time.monotonic() - started_at < RESPAWN_BACKOFF_SECONDS:
+            time.sleep(RESPAWN_BACKOFF_SECONDS)
+        children[spawn(app, listener, threaded)] = time.monotonic()
+    listener.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the quiz service with preloaded, forked workers.")
+    parser.add_argument("--workers", type=int, default=QUIZ_WORKERS)
+    parser.add_argument("--host", default=QUIZ_HOST)
+    parser.add_argument("--port", type=int, default=QUIZ_PORT)
+    parser.add_argument("--threaded", action="store_true", default=QUIZ_THREADED, help="a thread per request in each worker")
+    parser.add_argument("--no-gc-freeze", action="store_true", help="fork without gc.freeze() (for comparison)")
+    parser.add_argument("--access-log", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(process)d %(levelname)s %(message)s")
+    run(args.workers, args.host, args.port, args.threaded, not args.no_gc_freeze, args.access_log)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+Single-pass skill detection for CV text.
+
+Every skill (a question-bank key) and its synonyms are compiled once into
+one Aho-Corasick automaton (pyahocorasick), so a CV is scanned once no
+matter how many skills exist. Matches must sit on word boundaries, like
+the original per-keyword \\b...\\b regexes.
+"""
+import re
+
+# Other spellings of question-bank skills found in CVs
+SKILL_SYNONYMS = {
+    "javascript": ["js", "ecmascript", "es6"],
+    "nodejs": ["node.js", "node js", "expressjs", "express.js"],
+    "react": ["reactjs", "react.js"],
+    "react native": ["react-native"],
+    "angular": ["angularjs", "angular.js"],
+    "machine learning": ["ml", "scikit-learn", "sklearn"],
+    "kubernetes": ["k8s", "kubectl"],
+    "aws": ["amazon web services", "ec2", "s3"],
+    "sql": ["mysql", "postgresql", "postgres", "sqlite", "t-sql", "pl/sql"],
+    "git": ["github", "gitlab", "bitbucket"],
+    "html": ["html5"],
+    "css": ["css3", "scss", "sass"],
+    "c++": ["cpp"],
+    "nlp": ["natural language processing"],
+    "tensorflow": ["keras"],
+    "devops": ["ci/cd", "jenkins", "dev ops"],
+    "rest api": ["rest apis", "restful", "restful api"],
+    "cybersecurity": ["cyber security", "infosec", "penetration testing", "pentesting"],
+    "docker": ["dockerfile", "docker-compose"],
+}
+
+
+def _is_word_char(char):
+    return char.isalnum() or char == "_"
+
+
+class SkillMatcher:
+    """
+    Finds which of `skills` (plus `synonyms`) occur in a text
+    """
+
+    def __init__(self, skills, synonyms=SKILL_SYNONYMS):
+        self.skills = list(skills)
+        self._terms = {}
+        for skill in self.skills:
+            for term in [skill] + list(synonyms.get(skill, [])):
+                self._terms.setdefault(term.lower(), set()).add(skill)
+
+        try:
+            import ahocorasick
+
+            self._automaton = ahocorasick.Automaton()
+            for term, skills_for_term in self._terms.items():
+                self._automaton.add_word(term, (len(term), tuple(skills_for_term)))
+            self._automaton.make_automaton()
+            self.engine = "aho-corasick"
+        except ImportError:
+            # Without pyahocorasick: one precompiled pattern per term
+            self._automaton = None
+            self._patterns = [
+                (re.compile(rf"(?<!\w){re.escape(term)}(?!\w)"), skills_for_term)
+                for term, skills_for_term in self._terms.items()
+            ]
+            self.engine = "regex"
+
+    def find(self, text):
+        """
+        Skills mentioned in `text`, in order of first occurrence
+        """
+        text = text.lower()
+        found = {}
+        if self._automaton is not None:
+            for end, (length, skills) in self._automaton.iter(text):
+                start = end - length + 1
+                if start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if end + 1 < len(text) and _is_word_char(text[end + 1]):
+                    continue
+                for skill in skills:
+                    found.setdefault(skill, start)
+        else:
+            for pattern, skills in self._patterns:
+                match = pattern.search(text)
+                if match:
+                    for skill in skills:
+                        found[skill] = min(found.get(skill, match.start()), match.start())
+        return sorted(found, key=found.get)
+
+    def find_many(self, texts):
+        return [self.find(text) for text in texts]
@@ -0,0 +1,169 @@
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import time
+import uuid
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+from executors import io_pool
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES", str(200 * 1024 * 1024)))
+
+# Retention for videos/ and audios/: files older than UPLOAD_RETENTION_SECONDS
+# are deleted, then the least recently used ones until each folder fits in
+# UPLOAD_QUOTA_BYTES. 0 disables either limit.
+UPLOAD_RETENTION_SECONDS = int(os.environ.get("UPLOAD_RETENTION_SECONDS", str(24 * 3600)))
+UPLOAD_QUOTA_BYTES = int(os.environ.get("UPLOAD_QUOTA_BYTES", str(2 * 1024 ** 3)))
+# Whole request body: /finalize_interview carries a video and an audio file
+# plus form fields
+MAX_REQUEST_BYTES = int(os.environ.get("MAX_REQUEST_BYTES", str(2 * MAX_UPLOAD_BYTES + 1024 * 1024)))
+SWEEP_INTERVAL_SECONDS = int(os.environ.get("UPLOAD_SWEEP_INTERVAL", "600"))
+
+_PARTIAL_SUFFIX = ".part"
+
+
+def _extension(filename):
+    ext = os.path.splitext(filename or "")[1].lower()
+    return ext if re.fullmatch(r"\.[a-z0-9]{1,8}", ext) else ""
+
+
+async def save_upload(upload, directory, max_bytes=MAX_UPLOAD_BYTES):
+    """
+    Stream `upload` to `directory` in chunks, hashing as it goes, and store
+    it as <sha256><ext>. Returns (path, digest); an identical file already
+    stored is reused. Raises 413 past `max_bytes`.
+    """
+    if max_bytes and getattr(upload, "size", None) and upload.size > max_bytes:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds {max_bytes} bytes")
+
+    temp_path = os.path.join(directory, f"{uuid.uuid4().hex}{_PARTIAL_SUFFIX}")
+    digest = hashlib.sha256()
+    size = 0
+    f = await io_pool.run(open, temp_path, "wb")
+    try:
+        while True:
+            chunk = await upload.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if max_bytes and size > max_bytes:
+                raise HTTPException(status_code=413, detail=f"Upload exceeds {max_bytes} bytes")
+            digest.update(chunk)
+            await io_pool.run(f.write, chunk)
+    except BaseException:
+        await io_pool.run(f.close)
+        _remove(temp_path)
+        raise
+    await io_pool.run(f.close)
+
+    digest = digest.hexdigest()
+    path = os.path.join(directory, f"{digest}{_extension(upload.filename)}")
+    if os.path.exists(path):
+        _remove(temp_path)
+        os.utime(path)  # Recently used, so the sweeper keeps it longer
+    else:
+        os.replace(temp_path, path)
+    return path, digest
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class RequestSizeLimit:
+    """
+    ASGI middleware refusing request bodies over `max_bytes` before they are
+    spooled: from Content-Length up front, and by counting the chunks of
+    bodies sent without one. save_upload still checks each file.
+    """
+
+    def __init__(self, app, max_bytes=MAX_REQUEST_BYTES):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.max_bytes:
+            return await self.app(scope, receive, send)
+        detail = f"Request body exceeds {self.max_bytes} bytes"
+        length = dict(scope["headers"]).get(b"content-length", b"")
+        if length.isdigit() and int(length) > self.max_bytes:
+            response = JSONResponse({"detail": detail}, status_code=413, headers={"Connection": "close"})
+            return await response(scope, receive, send)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+# ---------------- Retention ---------------- #
+
+def sweep(directory, max_age_seconds=UPLOAD_RETENTION_SECONDS, quota_bytes=UPLOAD_QUOTA_BYTES):
+    """
+    Delete expired uploads, then the least recently used ones until the
+    folder is under quota.
+    Returns the number of uploads removed.
+    """
+    now = time.time()
+    entries = []
+    removed = 0
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if not os.path.isfile(path):
+            continue
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        if name.endswith(_PARTIAL_SUFFIX):
+            # Half-written file from an interrupted upload
+            if now - stat.st_mtime > 3600:
+                _remove(path)
+                removed += 1
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    for mtime, size, path in entries:
+        expired = max_age_seconds and now - mtime > max_age_seconds
+        over_quota = quota_bytes and total > quota_bytes
+        if not (expired or over_quota):
+            break
+        _remove(path)
+        total -= size
+        removed += 1
+    return removed
+
+
+async def sweep_forever(directories, interval=SWEEP_INTERVAL_SECONDS):
+    """
+    Background task running sweep() over `directories` every `interval` seconds
+    """
+    while True:
+        for directory in directories:
+            try:
+                removed = await io_pool.run(sweep, directory)
+                if removed:
+                    logger.info("Upload sweeper removed %d file(s) from %s", removed, directory)
+            except Exception:
+                logger.exception("Upload sweep of %s failed", directory)
+        await asyncio.sleep(interval)
@@ -0,0 +1,191 @@
+"""
+Bulk CV ingestion: summarize a folder (or .zip/.tar archive) of CVs and
+generate fallback interview questions for each one, in parallel.
+
+Results are streamed to a JSONL file in completion order, one record per
+CV with per-stage timings (or an error). Completed sources are appended to
+a checkpoint file so an interrupted run can be resumed.
+
+    python batch_ingest.py cvs/ -o results.jsonl --workers 8
+    python batch_ingest.py cvs.zip -o results.jsonl          # resumes
+"""
+import argparse
+import json
+import os
+import sys
+import tarfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+CV_EXTENSIONS = (".pdf", ".docx", ".txt")
+
+
+# ---------------- Sources ---------------- #
+
+def iter_sources(input_path):
+    """
+    Yield (source_id, name, path_or_bytes) for every CV under `input_path`.
+    Directory entries are passed as paths so workers read them directly;
+    archive members are read here and passed as bytes.
+    """
+    if os.path.isdir(input_path):
+        for root, dirs, files in os.walk(input_path):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(CV_EXTENSIONS):
+                    path = os.path.join(root, name)
+                    yield os.path.relpath(path, input_path), name, path
+    elif zipfile.is_zipfile(input_path):
+        with zipfile.ZipFile(input_path) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and info.filename.lower().endswith(CV_EXTENSIONS):
+                    yield f"{input_path}:{info.filename}", info.filename, archive.read(info)
+    elif tarfile.is_tarfile(input_path):
+        with tarfile.open(input_path) as archive:
+            for member in archive:
+                if member.isfile() and member.name.lower().endswith(CV_EXTENSIONS):
+                    yield f"{input_path}:{member.name}", member.name, archive.extractfile(member).read()
+    else:
+        raise ValueError(f"{input_path} is not a directory, zip or tar archive")
+
+
+# ---------------- Worker ---------------- #
+
+def process_cv(source_id, name, payload, num_questions):
+    """
+    Extract, summarize and generate questions for one CV (runs in a worker)
+    """
+    from app import (
+        extract_text_from_pdf,
+        extract_text_from_docx,
+        summarize_cv,
+        generate_questions_fallback
+    )
+
+    timings = {}
+    started = time.perf_counter()
+    record = {"source": source_id, "pid": os.getpid()}
+    try:
+        if isinstance(payload, str):
+            with open(payload, "rb") as f:
+                payload = f.read()
+        timings["read"] = time.perf_counter() - started
+
+        step = time.perf_counter()
+        lower_name = name.lower()
+        if lower_name.endswith(".pdf"):
+            text = extract_text_from_pdf(payload)
+        elif lower_name.endswith(".docx"):
+            text = extract_text_from_docx(payload)
+        else:
+            text = payload.decode("utf-8", errors="ignore")
+        timings["extract"] = time.perf_counter() - step
+        if text.startswith(("Error reading PDF:", "Error reading DOCX:")):
+            raise ValueError(text)
+
+        step = time.perf_counter()
+        summary = summarize_cv(text)
+        timings["summarize"] = time.perf_counter() - step
+
+        step = time.perf_counter()
+        questions = generate_questions_fallback(summary, num_questions)
+        timings["questions"] = time.perf_counter() - step
+
+        record.update(status="ok", chars=len(text), summary=summary, questions=questions)
+    except Exception as e:
+        record.update(status="error", error=f"{type(e).__name__}: {e}")
+    timings["total"] = time.perf_counter() - started
+    record["timings"] = {k: round(v, 4) for k, v in timings.items()}
+    return record
+
+
+# ---------------- Driver ---------------- #
+
+def load_checkpoint(checkpoint_path, retry_errors=False):
+    done = set()
+    if not os.path.exists(checkpoint_path):
+        return done
+    with open(checkpoint_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # Torn last line from an interrupted run
+            if retry_errors and entry.get("status") != "ok":
+                continue
+            done.add(entry["source"])
+    return done
+
+
+def run_batch(input_path, output_path, workers=None, max_in_flight=None, num_questions=4,
+              checkpoint_path=None, retry_errors=False):
+    """
+    Process every CV under `input_path`, appending JSONL records to
+    `output_path` as they complete. Returns a dict of counters.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or workers * 2
+    checkpoint_path = checkpoint_path or f"{output_path}.checkpoint"
+    done = load_checkpoint(checkpoint_path, retry_errors)
+    stats = {"submitted": 0, "ok": 0, "error": 0, "skipped": 0}
+    started = time.perf_counter()
+
+    with open(output_path, "a", encoding="utf-8") as out, \
+            open(checkpoint_path, "a", encoding="utf-8") as checkpoint, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+
+        def drain(pending, block_until):
+            while len(pending) > block_until:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    pending.discard(future)
+                    record = future.result()
+                    stats[record["status"]] += 1
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    out.flush()
+                    checkpoint.write(json.dumps({"source": record["source"], "status": record["status"]}) + "\n")
+                    checkpoint.flush()
+
+        pending = set()
+        for source_id, name, payload in iter_sources(input_path):
+            if source_id in done:
+                stats["skipped"] += 1
+                continue
+            # Bounded in-flight work: never hold more than max_in_flight CVs in memory
+            drain(pending, max_in_flight - 1)
+            pending.add(pool.submit(process_cv, source_id, name, payload, num_questions))
+            stats["submitted"] += 1
+        drain(pending, 0)
+
+    stats["elapsed_s"] = round(time.perf_counter() - started, 3)
+    processed = stats["ok"] + stats["error"]
+    stats["cvs_per_s"] = round(processed / stats["elapsed_s"], 2) if stats["elapsed_s"] else 0.0
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize a folder or archive of CVs in parallel.")
+    parser.add_argument("input", help="directory, .zip or .tar(.gz) of CVs")
+    parser.add_argument("-o", "--output", default="cv_batch.jsonl", help="JSONL output file (appended)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--max-in-flight", type=int, default=None, help="max CVs queued at once (default: 2x workers)")
+    parser.add_argument("--num-questions", type=int, default=4)
+    parser.add_argument("--checkpoint", default=None, help="checkpoint file (default: OUTPUT.checkpoint)")
+    parser.add_argument("--retry-errors", action="store_true", help="reprocess sources that failed last time")
+    args = parser.parse_args(argv)
+
+    stats = run_batch(
+        args.input,
+        args.output,
+        workers=args.workers,
+        max_in_flight=args.max_in_flight,
+        num_questions=args.num_questions,
+        checkpoint_path=args.checkpoint,
+        retry_errors=args.retry_errors
+    )
+    print(json.dumps(stats), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Parity check and benchmark for the single-pass CV section classifier.
+
+Generates a synthetic corpus of CVs (with and without section headers),
+checks that app.summarize_cv / extract_cv_content_intelligent produce
+exactly the same output as the original per-pattern / per-keyword
+implementation (frozen in tests/cv_baseline.py, also checked by
+tests/test_cv_sections.py), then times both.
+
+    python benchmarks/bench_cv_sections.py --cvs 5000
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "tests")]
+
+import app  # noqa: E402
+from cv_sections import MATCHER  # noqa: E402
+from cv_baseline import summarize_cv as baseline_summarize_cv, synthetic_corpus  # noqa: E402
+from cv_baseline import extract_cv_content_intelligent as baseline_extract  # noqa: E402
+
+
+def timed(fn, corpus):
+    start = time.perf_counter()
+    for text in corpus:
+        fn(text)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cvs", type=int, default=5000, help="number of synthetic CVs")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    corpus = synthetic_corpus(args.cvs, args.seed)
+    all_lines = [line.strip() for text in corpus for line in text.splitlines() if line.strip()]
+
+    # Parity: identical summary for every CV and identical per-line classification
+    for text in corpus:
+        assert app.summarize_cv(text) == baseline_summarize_cv(text), text
+    assert app.extract_cv_content_intelligent(all_lines) == baseline_extract(all_lines)
+    print(f"parity ok: {len(corpus)} CVs, {len(all_lines)} lines (matcher: {MATCHER})")
+
+    legacy = timed(baseline_summarize_cv, corpus)
+    current = timed(app.summarize_cv, corpus)
+    print(f"summarize_cv        legacy {legacy:.3f}s  single-pass {current:.3f}s  "
+          f"({len(corpus) / current:.0f} CVs/s, x{legacy / current:.2f})")
+
+    legacy = timed(baseline_extract, [all_lines])
+    current = timed(app.extract_cv_content_intelligent, [all_lines])
+    print(f"intelligent extract legacy {legacy:.3f}s  single-pass {current:.3f}s  "
+          f"({len(all_lines) / current:.0f} lines/s, x{legacy / current:.2f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Scaling of time-range parallel facial emotion analysis from 1 to N worker
+processes.
+
+Without arguments a synthetic video is generated; pass a video path to
+benchmark a real recording. Every run is checked against the sequential
+timeline. Model loading happens once per worker before timing starts.
+
+    python benchmarks/bench_emotion_scaling.py --seconds 120 --max-workers 8
+    python benchmarks/bench_emotion_scaling.py interview.webm --every-seconds 0.5
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+
+import cv2  # noqa: E402
+import numpy as np  # noqa: E402
+
+from facial_emotion import (  # noqa: E402
+    analyze_facial_emotions,
+    analyze_facial_emotions_parallel,
+    sample_interval
+)
+from model_registry import registry  # noqa: E402
+
+
+def synthetic_video(path, seconds, fps=30, size=(640, 480)):
+    """
+    Write a moving-gradient video (every frame differs, so decoding is real work)
+    """
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+    width, height = size
+    xs = np.arange(width, dtype=np.uint16)
+    for i in range(seconds * fps):
+        frame = np.empty((height, width, 3), np.uint8)
+        frame[:] = ((xs + i * 4) % 256).astype(np.uint8)[None, :, None]
+        cv2.circle(frame, (width // 2 + int(80 * np.sin(i / 15)), height // 2), 90, (200, 180, 160), -1)
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+def warm_worker():
+    registry.get("deepface")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("video", nargs="?", help="video to analyze (default: synthetic)")
+    parser.add_argument("--seconds", type=int, default=60, help="length of the synthetic video")
+    parser.add_argument("--every-seconds", type=float, default=1.0, help="sampling period")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    video = args.video
+    if video is None:
+        video = synthetic_video(os.path.join(tempfile.mkdtemp(), "synthetic.mp4"), args.seconds)
+    interval = sample_interval(every_seconds=args.every_seconds)
+
+    warm_worker()
+    started = time.perf_counter()
+    baseline = analyze_facial_emotions(video, every_seconds=interval)
+    sequential = time.perf_counter() - started
+    frames = len(baseline["timeline"])
+    print(f"{video}: {frames} sampled frames every {interval:g}s")
+    print(f"{'workers':>8} {'seconds':>9} {'frames/s':>9} {'speedup':>8}")
+    print(f"{'seq':>8} {sequential:9.2f} {frames / sequential:9.1f} {1.0:8.2f}")
+
+    counts = sorted({2 ** i for i in range(args.max_workers.bit_length()) if 2 ** i <= args.max_workers}
+                    | {args.max_workers})
+    for workers in counts:
+        with ProcessPoolExecutor(max_workers=workers, initializer=warm_worker) as pool:
+            # Start every worker and load its model before timing
+            list(pool.map(time.sleep, [0.1] * workers))
+            started = time.perf_counter()
+            result = analyze_facial_emotions_parallel(video, workers=workers, every_seconds=interval, executor=pool)
+            elapsed = time.perf_counter() - started
+        assert result["timeline"] == baseline["timeline"], f"timeline mismatch with {workers} workers"
+        print(f"{workers:>8} {elapsed:9.2f} {frames / elapsed:9.1f} {sequential / elapsed:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Throughput and peak memory of the PyPDF2 and pdfminer extraction engines.
+
+Without arguments a synthetic multi-page portfolio is generated; pass PDF
+paths to benchmark real documents. Each engine is measured extracting the
+whole document and with the default CV page/char budget.
+
+    python benchmarks/bench_pdf_engines.py --pages 200
+    python benchmarks/bench_pdf_engines.py portfolio1.pdf portfolio2.pdf
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_engine import ENGINES, DEFAULT_MAX_CHARS, DEFAULT_MAX_PAGES, extract_pdf_text  # noqa: E402
+
+
+def synthetic_pdf(pages, lines_per_page=45):
+    """
+    Build a plain-text PDF with Helvetica pages of CV-like lines
+    """
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # Pages, filled in once page ids are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for page in range(pages):
+        lines = [f"Project {page}-{i}: Developed a Python and Docker platform for client {i} (2019 - 2023)"
+                 for i in range(lines_per_page)]
+        content = "BT /F1 10 Tf 40 800 Td 14 TL " + " ".join(f"({line}) '" for line in lines) + " ET"
+        content = content.encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+        content_id = len(objects)
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id)
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % pid for pid in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % len(page_ids)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def measure(data, engine, max_pages, max_chars):
+    tracemalloc.start()
+    started = time.perf_counter()
+    text = extract_pdf_text(data, engine=engine, max_pages=max_pages, max_chars=max_chars)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, len(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("pdfs", nargs="*", help="PDF files to benchmark (default: synthetic)")
+    parser.add_argument("--pages", type=int, default=200, help="pages in the synthetic PDF")
+    args = parser.parse_args()
+
+    documents = [(path, open(path, "rb").read()) for path in args.pdfs]
+    if not documents:
+        documents = [(f"synthetic-{args.pages}p", synthetic_pdf(args.pages))]
+
+    for label, data in documents:
+        print(f"\n{label} ({len(data) / 1024:.0f} KiB)")
+        for engine in ENGINES:
+            for mode, max_pages, max_chars in (("full", 0, 0), ("budget", DEFAULT_MAX_PAGES, DEFAULT_MAX_CHARS)):
+                elapsed, peak, chars = measure(data, engine, max_pages, max_chars)
+                print(f"  {engine:9s} {mode:7s} {elapsed:7.3f}s  {chars / elapsed / 1e6:6.2f} Mchar/s  "
+                      f"peak {peak / 2**20:7.1f} MiB  ({chars} chars)")
+
+
+if __name__ == "__main__":
+    main()
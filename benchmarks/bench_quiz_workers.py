@@ -0,0 +1,150 @@
+"""
+Per-worker memory and requests/sec of the preforked quiz service
+(backend/serve_quiz.py) as the worker count grows.
+
+Each configuration starts the server, drives /generate-quiz + /submit-quiz
+from client processes for a fixed time, then reads every worker's unique
+(USS) and proportional (PSS) memory from /proc. USS is what each extra
+worker really costs; the parent's preloaded pages are shared and show up
+only in PSS. Linux only.
+
+    python benchmarks/bench_quiz_workers.py --max-workers 8 --seconds 10
+    python benchmarks/bench_quiz_workers.py --compare-freeze
+    WARMUP_MODELS=spacy SKILL_NER=1 python benchmarks/bench_quiz_workers.py
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.parse
+from multiprocessing import Pool
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER = os.path.join(ROOT, "backend", "serve_quiz.py")
+
+CV_TEXT = ("Backend developer: Python, Flask and Django services, PostgreSQL and SQL tuning, "
+           "Docker and Kubernetes deployments, Git, CI/CD, some React and JavaScript.")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(port, process, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with status {process.returncode}")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/ready")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("server did not become ready")
+
+
+def worker_pids(parent):
+    pids = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == parent:
+            pids.append(int(entry))
+    return sorted(pids)
+
+
+def memory_kb(pid):
+    """
+    (uss, pss, rss) in kB from /proc/<pid>/smaps_rollup
+    """
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                values[parts[0].rstrip(":")] = int(parts[1])
+    return values["Private_Clean"] + values["Private_Dirty"], values["Pss"], values["Rss"]
+
+
+def client(args):
+    """
+    Generate and submit quizzes until `deadline`; returns the request count
+    """
+    port, deadline = args
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    body = urllib.parse.urlencode({"text": CV_TEXT})
+    form = {"Content-Type": "application/x-www-form-urlencoded"}
+    requests_done = 0
+    while time.time() < deadline:
+        conn.request("POST", "/generate-quiz", body, form)
+        response = conn.getresponse()
+        quiz = json.loads(response.read())
+        answers = [{"id": q["id"], "answer": 0} for q in quiz["questions"]]
+        conn.request("POST", "/submit-quiz", json.dumps({"quiz_id": quiz["quiz_id"], "answers": answers}),
+                     {"Content-Type": "application/json"})
+        response = conn.getresponse()
+        response.read()
+        assert response.status == 200, response.status
+        requests_done += 2
+    return requests_done
+
+
+def measure(workers, clients, seconds, freeze):
+    port = free_port()
+    env = dict(os.environ, QUIZ_STORE_PATH=os.path.join(tempfile.mkdtemp(), "quizzes.sqlite3"))
+    command = [sys.executable, SERVER, "--workers", str(workers), "--host", "127.0.0.1", "--port", str(port)]
+    if not freeze:
+        command.append("--no-gc-freeze")
+    server = subprocess.Popen(command, env=env, stderr=subprocess.DEVNULL)
+    try:
+        wait_ready(port, server)
+        parent_uss = memory_kb(server.pid)[0]
+        with Pool(clients) as pool:
+            started = time.perf_counter()
+            total = sum(pool.map(client, [(port, time.time() + seconds)] * clients))
+            elapsed = time.perf_counter() - started
+        usage = [memory_kb(pid) for pid in worker_pids(server.pid)]
+    finally:
+        server.terminate()
+        server.wait()
+    uss = sum(u for u, _, _ in usage) / len(usage)
+    pss = sum(p for _, p, _ in usage) / len(usage)
+    rss = sum(r for _, _, r in usage) / len(usage)
+    return total / elapsed, parent_uss, uss, pss, rss
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--clients", type=int, default=None, help="client processes (default: 2x workers)")
+    parser.add_argument("--seconds", type=float, default=5.0, help="load duration per configuration")
+    parser.add_argument("--compare-freeze", action="store_true", help="also run without gc.freeze()")
+    args = parser.parse_args()
+
+    counts = sorted({2 ** i for i in range(args.max_workers.bit_length()) if 2 ** i <= args.max_workers}
+                    | {args.max_workers})
+    print(f"{'workers':>8} {'gc':>7} {'req/s':>8} {'parent USS':>11} "
+          f"{'worker USS':>11} {'worker PSS':>11} {'worker RSS':>11}  (MiB)")
+    for workers in counts:
+        for freeze in (True, False) if args.compare_freeze else (True,):
+            rps, parent, uss, pss, rss = measure(workers, args.clients or 2 * workers, args.seconds, freeze)
+            print(f"{workers:>8} {'frozen' if freeze else 'normal':>7} {rps:8.0f} {parent / 1024:11.1f} "
+                  f"{uss / 1024:11.1f} {pss / 1024:11.1f} {rss / 1024:11.1f}")
+
+
+if __name__ == "__main__":
+    main()
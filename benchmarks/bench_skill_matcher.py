@@ -0,0 +1,122 @@
+"""
+Requests/sec of the quiz service's skill extraction, before and after the
+single-pass skill matcher.
+
+"legacy" is the original extract_entities (a regex compiled and run per
+keyword, plus the full transformer pass with --with-spacy); "matcher" is
+the current one. /generate-quiz is driven through Flask's test client so
+the numbers include quiz building and JSON encoding.
+
+    python benchmarks/bench_skill_matcher.py --cvs 2000
+    python benchmarks/bench_skill_matcher.py --cvs 50 --with-spacy
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+
+import appp  # noqa: E402
+
+LEGACY_KEYWORDS = [
+    "python", "java", "angular", "flask", "sql", "docker", "aws",
+    "machine learning", "react", "c++", "kotlin", "html", "css", "javascript"
+]
+
+FILLER = [
+    "Worked with cross-functional teams to deliver features on time",
+    "Designed the data model and wrote integration tests",
+    "Mentored two junior developers and ran code reviews",
+    "Improved page load time by 40% through caching",
+    "Led the migration of legacy services",
+    "Bachelor degree in Computer Science, ESPRIT",
+]
+MENTIONS = [
+    "Python", "Java", "Angular", "Flask", "SQL", "PostgreSQL", "Docker", "AWS", "Machine Learning",
+    "React", "React Native", "Kotlin", "HTML5", "CSS", "JavaScript", "Node.js", "Django", "Git",
+    "GitHub", "Kubernetes", "k8s", "TensorFlow", "Pandas", "NLP", "REST API", "DevOps", "CI/CD",
+]
+
+
+def legacy_extract_entities(text, nlp=None):
+    if nlp is not None:
+        nlp(text)  # Computed and discarded, as in the original
+    entities = {"skills": []}
+    text_lower = text.lower()
+    for word in LEGACY_KEYWORDS:
+        if re.search(rf"\b{re.escape(word)}\b", text_lower):
+            entities["skills"].append(word)
+    entities["skills"] = list(set(entities["skills"]))
+    return entities
+
+
+def synthetic_cvs(count, seed=7):
+    rng = random.Random(seed)
+    cvs = []
+    for _ in range(count):
+        lines = []
+        for _ in range(rng.randint(40, 120)):
+            line = rng.choice(FILLER)
+            if rng.random() < 0.3:
+                line += " using " + ", ".join(rng.sample(MENTIONS, rng.randint(1, 4)))
+            lines.append(line)
+        cvs.append(appp.clean_text("\n".join(lines)))
+    return cvs
+
+
+def rate(count, elapsed):
+    return count / elapsed if elapsed else float("inf")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cvs", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=32, help="texts per bulk request")
+    parser.add_argument("--with-spacy", action="store_true", help="include the transformer pass in legacy")
+    args = parser.parse_args()
+
+    cvs = synthetic_cvs(args.cvs)
+    nlp = appp.registry.get("spacy") if args.with_spacy else None
+    print(f"{len(cvs)} CVs, matcher engine: {appp.current_skill_matcher().engine}")
+
+    started = time.perf_counter()
+    legacy = [legacy_extract_entities(text, nlp) for text in cvs]
+    legacy_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    current = [appp.extract_entities(text) for text in cvs]
+    current_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for i in range(0, len(cvs), args.batch):
+        appp.extract_entities_bulk(cvs[i:i + args.batch])
+    bulk_s = time.perf_counter() - started
+
+    missed = sum(len(set(new["skills"]) - set(old["skills"])) for old, new in zip(legacy, current))
+    print(f"extract_entities  legacy {rate(len(cvs), legacy_s):10.0f} CV/s")
+    print(f"extract_entities  matcher {rate(len(cvs), current_s):9.0f} CV/s  ({legacy_s / current_s:.1f}x)")
+    print(f"bulk (batch {args.batch:>3})  matcher {rate(len(cvs), bulk_s):9.0f} CV/s")
+    print(f"skills found only by the matcher: {missed}")
+
+    client = appp.app.test_client()
+    for label, extractor in (("legacy", lambda text: legacy_extract_entities(text, nlp)),
+                             ("matcher", appp.extract_entities)):
+        original, appp.extract_entities = appp.extract_entities, extractor
+        try:
+            started = time.perf_counter()
+            for text in cvs:
+                response = client.post("/generate-quiz", data={"text": text})
+                assert response.status_code == 200, response.data
+            elapsed = time.perf_counter() - started
+        finally:
+            appp.extract_entities = original
+        print(f"/generate-quiz  {label:<8} {rate(len(cvs), elapsed):8.0f} req/s")
+
+
+if __name__ == "__main__":
+    main()
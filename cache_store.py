@@ -0,0 +1,172 @@
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def make_key(*parts):
+    """
+    Build a stable cache key from arbitrary parts (digests, ints, model names...)
+    """
+    h = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, bytes):
+            h.update(part)
+        else:
+            h.update(repr(part).encode("utf-8"))
+        h.update(b"\x1f")
+    return h.hexdigest()
+
+
+class TwoTierCache:
+    """
+    Bounded in-memory LRU cache with an optional on-disk tier.
+
+    Values must be picklable when a disk directory is configured. Disk entries
+    are written atomically and evicted least-recently-used first once the
+    directory grows past `disk_max_bytes`.
+    """
+
+    def __init__(self, name, max_entries=128, disk_dir=None, disk_max_bytes=None):
+        self.name = name
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "disk_evictions": 0}
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    # ---------------- Memory tier ---------------- #
+
+    def _remember(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    # ---------------- Disk tier ---------------- #
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.pkl")
+
+    def _disk_get(self, key):
+        if not self.disk_dir:
+            return _MISSING
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+            os.utime(path)  # Refresh recency for LRU eviction
+            return value
+        except FileNotFoundError:
+            return _MISSING
+        except Exception as e:
+            logger.warning("[%s] dropping unreadable cache entry %s: %s", self.name, key, e)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return _MISSING
+
+    def _disk_set(self, key, value):
+        if not self.disk_dir:
+            return
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._disk_path(key))
+        except Exception as e:
+            logger.warning("[%s] could not persist cache entry %s: %s", self.name, key, e)
+            return
+        if self.disk_max_bytes:
+            self._disk_evict()
+
+    def _disk_evict(self):
+        entries = []
+        total = 0
+        with os.scandir(self.disk_dir) as it:
+            for entry in it:
+                if not entry.name.endswith(".pkl"):
+                    continue
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+        if total <= self.disk_max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                self._stats["disk_evictions"] += 1
+            except FileNotFoundError:
+                pass
+
+    # ---------------- Public API ---------------- #
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                logger.info("[%s] cache hit (memory) %s", self.name, key[:12])
+                return self._entries[key]
+            value = self._disk_get(key)
+            if value is not _MISSING:
+                self._remember(key, value)
+                self._stats["disk_hits"] += 1
+                logger.info("[%s] cache hit (disk) %s", self.name, key[:12])
+                return value
+            self._stats["misses"] += 1
+            logger.info("[%s] cache miss %s", self.name, key[:12])
+            return default
+
+    def set(self, key, value):
+        with self._lock:
+            self._remember(key, value)
+            self._disk_set(key, value)
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached value for `key`, calling `compute()` and storing its
+        result on a miss.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def __contains__(self, key):
+        with self._lock:
+            if key in self._entries:
+                return True
+        return bool(self.disk_dir) and os.path.exists(self._disk_path(key))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+        lookups = stats["hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["hits"] + stats["disk_hits"]) / lookups, 3) if lookups else 0.0
+        return stats
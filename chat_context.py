@@ -0,0 +1,213 @@
+"""
+Bounded prompt context for the AI interviewer.
+
+Instead of resending the whole CV summary and the whole conversation on
+every turn, build_context keeps the last CHAT_KEEP_TURNS exchanges
+verbatim, folds older messages into a condensed running summary, keeps
+the CV sections closest to the current topic and fits everything into a
+per-request token budget.
+
+Token counts are estimates (about 4 characters per token, plus a small
+per-message overhead): close enough for budgeting across the models we
+route to, without shipping a tokenizer for each of them.
+"""
+import os
+import re
+import threading
+from collections import deque
+
+# Exchanges (candidate message + interviewer reply) kept word for word
+CHAT_KEEP_TURNS = int(os.environ.get("CHAT_KEEP_TURNS", "4"))
+# Whole request: system prompt, CV, condensed summary, recent turns, message
+CHAT_TOKEN_BUDGET = int(os.environ.get("CHAT_TOKEN_BUDGET", "3000"))
+CHAT_CV_TOKENS = int(os.environ.get("CHAT_CV_TOKENS", "800"))
+CHAT_SUMMARY_TOKENS = int(os.environ.get("CHAT_SUMMARY_TOKENS", "400"))
+# Characters kept from each folded message
+FOLD_CHARS = 160
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SECTION_HEADER = re.compile(r'^#{1,3}\s+')
+TOPIC_WORD = re.compile(r"[a-z0-9][a-z0-9+#.\-]{2,}")
+STOPWORDS = {
+    "the", "and", "for", "with", "you", "your", "are", "was", "were", "that", "this", "have", "has",
+    "what", "how", "why", "can", "about", "from", "but", "not", "did", "our", "they", "their", "there",
+    "would", "could", "which", "when", "where", "will", "been", "into", "also", "more", "some", "tell",
+}
+SPEAKERS = {"user": "Candidate", "assistant": "Interviewer"}
+
+
+def estimate_tokens(text):
+    return (len(text) + 3) // 4
+
+
+def message_tokens(messages):
+    return sum(estimate_tokens(m.get("content") or "") + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+
+# ---------------- CV trimming ---------------- #
+
+def split_sections(cv_summary):
+    """
+    [(header_line, text)] for a markdown summary as written by summarize_cv;
+    text before the first header becomes a section with an empty header
+    """
+    sections, header, lines = [], "", []
+    for line in cv_summary.splitlines():
+        if SECTION_HEADER.match(line):
+            if header or any(l.strip() for l in lines):
+                sections.append((header, "\n".join(lines).strip()))
+            header, lines = line.strip(), []
+        else:
+            lines.append(line)
+    if header or any(l.strip() for l in lines):
+        sections.append((header, "\n".join(lines).strip()))
+    return sections
+
+
+def topic_words(text):
+    return {word.strip(".-") for word in TOPIC_WORD.findall(text.lower())} - STOPWORDS
+
+
+def relevant_cv(cv_summary, topic, max_tokens):
+    """
+    The CV sections sharing the most words with `topic`, in their original
+    order, within `max_tokens`. The whole summary is returned when it fits.
+    """
+    if estimate_tokens(cv_summary) <= max_tokens:
+        return cv_summary
+    sections = split_sections(cv_summary)
+    words = topic_words(topic)
+    ranked = sorted(
+        range(len(sections)),
+        key=lambda i: (-len(words & topic_words(" ".join(sections[i]))), i)
+    )
+    kept, used = {}, 0
+    for i in ranked:
+        header, text = sections[i]
+        block = f"{header}\n{text}".strip()
+        room = max_tokens - used
+        if estimate_tokens(block) > room:
+            if kept or room < 20:
+                continue
+            block = _truncate_lines(block, room)  # Nothing kept yet: take what fits of the best one
+        kept[i] = block
+        used += estimate_tokens(block) + 1
+    return "\n\n".join(kept[i] for i in sorted(kept))
+
+
+def _truncate_lines(text, max_tokens):
+    lines, used = [], 0
+    for line in text.splitlines():
+        cost = estimate_tokens(line) + 1
+        if used + cost > max_tokens:
+            break
+        lines.append(line)
+        used += cost
+    return "\n".join(lines)
+
+
+# ---------------- Conversation folding ---------------- #
+
+def fold_messages(messages, max_tokens):
+    """
+    One condensed line per message ("Candidate: ..."), keeping the most
+    recent lines that fit in `max_tokens`
+    """
+    lines = []
+    for message in messages:
+        content = " ".join((message.get("content") or "").split())
+        if len(content) > FOLD_CHARS:
+            content = content[:FOLD_CHARS].rsplit(" ", 1)[0] + "..."
+        lines.append(f"- {SPEAKERS.get(message.get('role'), message.get('role', 'Note'))}: {content}")
+
+    kept, used = [], 0
+    for line in reversed(lines):
+        cost = estimate_tokens(line) + 1
+        if used + cost > max_tokens:
+            break
+        kept.append(line)
+        used += cost
+    kept.reverse()
+    if len(kept) < len(lines):
+        kept.insert(0, f"- ({len(lines) - len(kept)} earlier messages omitted)")
+    return "\n".join(kept) if max_tokens > 0 and messages else ""
+
+
+def build_context(message, cv_summary, history, fixed_tokens=0, keep_turns=CHAT_KEEP_TURNS,
+                  budget=CHAT_TOKEN_BUDGET, cv_tokens=CHAT_CV_TOKENS, summary_tokens=CHAT_SUMMARY_TOKENS):
+    """
+    Fit one interviewer turn into `budget` tokens. `fixed_tokens` is the
+    cost of the prompt text around the CV. Returns a dict with the trimmed
+    "cv_summary", the condensed "earlier" conversation, the verbatim
+    "history" to send and the turn's token "stats".
+
+    Over budget, the oldest verbatim messages are folded first, then the
+    condensed summary is dropped, then the CV is shrunk; the candidate's
+    message itself is always sent.
+    """
+    history = list(history)
+    split = max(0, len(history) - 2 * keep_turns)
+    recent = history[split:]
+    topic = " ".join([message] + [m.get("content") or "" for m in recent[-2:]])
+    cv_text = relevant_cv(cv_summary, topic, cv_tokens)
+    earlier = fold_messages(history[:split], summary_tokens)
+
+    def total():
+        return (fixed_tokens + estimate_tokens(cv_text) + estimate_tokens(earlier)
+                + message_tokens(recent) + estimate_tokens(message) + 2 * MESSAGE_OVERHEAD_TOKENS)
+
+    while total() > budget and recent:
+        split += 1
+        recent = history[split:]
+        earlier = fold_messages(history[:split], summary_tokens)
+    if total() > budget:
+        earlier = ""
+    while total() > budget and cv_text:
+        cv_tokens //= 2
+        cv_text = relevant_cv(cv_summary, topic, cv_tokens) if cv_tokens >= 20 else ""
+
+    full = (fixed_tokens + estimate_tokens(cv_summary) + message_tokens(history)
+            + estimate_tokens(message) + 2 * MESSAGE_OVERHEAD_TOKENS)
+    stats = {
+        "prompt_tokens": total(),
+        "full_prompt_tokens": full,
+        "cv_tokens": estimate_tokens(cv_text),
+        "summary_tokens": estimate_tokens(earlier),
+        "history_tokens": message_tokens(recent),
+        "message_tokens": estimate_tokens(message),
+        "verbatim_messages": len(recent),
+        "folded_messages": split,
+        "over_budget": total() > budget,
+    }
+    return {"cv_summary": cv_text, "earlier": earlier, "history": recent, "stats": stats}
+
+
+# ---------------- Metrics ---------------- #
+
+_metrics_lock = threading.Lock()
+_metrics = {"turns": 0, "prompt_tokens": 0, "full_prompt_tokens": 0, "max_prompt_tokens": 0, "over_budget": 0}
+_recent_turns = deque(maxlen=100)
+
+
+def record_turn(stats):
+    with _metrics_lock:
+        _metrics["turns"] += 1
+        _metrics["prompt_tokens"] += stats["prompt_tokens"]
+        _metrics["full_prompt_tokens"] += stats["full_prompt_tokens"]
+        _metrics["max_prompt_tokens"] = max(_metrics["max_prompt_tokens"], stats["prompt_tokens"])
+        _metrics["over_budget"] += int(stats["over_budget"])
+        _recent_turns.append(stats)
+
+
+def get_metrics():
+    """
+    Estimated prompt tokens sent vs. what full-history prompts would have
+    cost, plus the per-turn breakdown of the last turns
+    """
+    with _metrics_lock:
+        metrics = dict(_metrics)
+        metrics["recent_turns"] = list(_recent_turns)
+    full = metrics["full_prompt_tokens"]
+    metrics["saved_ratio"] = round(1 - metrics["prompt_tokens"] / full, 3) if full else 0.0
+    metrics["avg_prompt_tokens"] = round(metrics["prompt_tokens"] / metrics["turns"], 1) if metrics["turns"] else 0.0
+    return metrics
@@ -0,0 +1,137 @@
+import re
+from functools import reduce
+from operator import itemgetter, or_
+
+# Section header patterns, tried in this order (first match wins)
+SECTION_HEADERS = {
+    'profile': r'profile|summary|about|objective|introduction',
+    'skills': r'skills?|technical skills?|competenc|technologies|expertise',
+    'experience': r'experience|work experience|employment|professional experience',
+    'education': r'education|academic|qualifications?',
+    'projects': r'projects?|portfolio|work samples?',
+    'languages': r'languages?|linguistic skills?',
+    'certifications': r'certifications?|certificates?|training|courses?'
+}
+
+# Keywords for classifying lines when a CV has no recognizable headers,
+# listed in classification priority order. With pyahocorasick installed all
+# of them are matched by one automaton built at import time.
+CONTENT_KEYWORDS = {
+    'education': ['university', 'college', 'school', 'degree', 'bachelor', 'master',
+                  'diploma', 'baccalaureate', 'engineering', 'computer science', 'esprit'],
+    'certifications': ['certification', 'certificate', 'certified', 'ccna', 'aws certified',
+                       'training', 'course'],
+    'languages': ['english', 'french', 'arabic', 'spanish', 'german', 'fluent', 'native'],
+    'projects': ['project', 'platform', 'application', 'system', 'website', 'app',
+                 'developed', 'built', 'created', 'implemented'],
+    'experience': ['intern', 'developer', 'engineer', 'manager', 'analyst', 'consultant',
+                   'worked', 'developed', 'implemented', 'led', 'managed', 'designed'],
+    'skills': ['python', 'java', 'javascript', 'react', 'node', 'docker', 'kubernetes',
+               'aws', 'azure', 'gcp', 'ci/cd', 'devops', 'git', 'sql', 'mongodb',
+               'framework', 'library', 'database', 'tool', 'technology', 'angular', 'vue'],
+}
+
+# A dated line mentioning one of these is treated as experience
+DATED_EXPERIENCE_HINTS = ['tunis', 'intern', 'engineer']
+_DATED_HINT = 'dated_hint'
+
+LANGUAGE_LINE_MAX = 100
+YEAR_PATTERN = re.compile(r'\d{4}')
+PAGE_NUMBER_PATTERN = re.compile(r'^\d+$')
+
+
+def _build_header_pattern():
+    groups = "|".join(f"(?P<{name}>{pattern})" for name, pattern in SECTION_HEADERS.items())
+    return re.compile(f"^(?:{groups})$", re.I)
+
+
+def _build_keyword_masks():
+    """
+    Bitmask of categories per keyword (bit order = CATEGORY_BITS)
+    """
+    masks = {}
+    for category, keywords in CONTENT_KEYWORDS.items():
+        for keyword in keywords:
+            masks[keyword] = masks.get(keyword, 0) | CATEGORY_BITS[category]
+    for keyword in DATED_EXPERIENCE_HINTS:
+        masks[keyword] = masks.get(keyword, 0) | CATEGORY_BITS[_DATED_HINT]
+    return masks
+
+
+def _build_decision_table():
+    """
+    Precompute the section for every (category mask, long line) combination
+    """
+    table = {}
+    for mask in range(1 << len(CATEGORY_BITS)):
+        for long_line in (False, True):
+            decision = None
+            for category in CATEGORY_PRIORITY:
+                if mask & CATEGORY_BITS[category]:
+                    if category == 'languages' and long_line:
+                        continue
+                    decision = category
+                    break
+            if decision is None and mask & CATEGORY_BITS[_DATED_HINT]:
+                decision = _DATED_HINT
+            table[mask, long_line] = decision
+    return table
+
+
+CATEGORY_PRIORITY = list(CONTENT_KEYWORDS)
+CATEGORY_BITS = {name: 1 << bit for bit, name in enumerate(CATEGORY_PRIORITY + [_DATED_HINT])}
+KEYWORD_MASKS = _build_keyword_masks()
+HEADER_PATTERN = _build_header_pattern()
+DECISION_TABLE = _build_decision_table()
+
+try:
+    import ahocorasick
+
+    # Aho-Corasick reports every (overlapping) keyword occurrence in one pass
+    _automaton = ahocorasick.Automaton()
+    for _keyword, _mask in KEYWORD_MASKS.items():
+        _automaton.add_word(_keyword, _mask)
+    _automaton.make_automaton()
+    MATCHER = "aho-corasick"
+
+    def keyword_mask(line_lower, long_line=False):
+        """
+        Categories of every keyword occurring anywhere in `line_lower`
+        """
+        return reduce(or_, map(itemgetter(1), _automaton.iter(line_lower)), 0)
+
+except ImportError:
+    MATCHER = "substring-scan"
+
+    def keyword_mask(line_lower, long_line=False):
+        """
+        Without pyahocorasick: stop at the first category that decides the
+        line, which yields the same DECISION_TABLE entry as the full mask
+        """
+        for category in CATEGORY_PRIORITY:
+            if category == 'languages' and long_line:
+                continue
+            if any(kw in line_lower for kw in CONTENT_KEYWORDS[category]):
+                return CATEGORY_BITS[category]
+        if any(kw in line_lower for kw in DATED_EXPERIENCE_HINTS):
+            return CATEGORY_BITS[_DATED_HINT]
+        return 0
+
+
+def match_section_header(line_lower):
+    """
+    Name of the section whose header `line_lower` is, or None
+    """
+    match = HEADER_PATTERN.match(line_lower)
+    return match.lastgroup if match else None
+
+
+def classify_line(line):
+    """
+    Section a content line belongs to when the CV has no headers, or None
+    """
+    long_line = len(line) >= LANGUAGE_LINE_MAX
+    decision = DECISION_TABLE[keyword_mask(line.lower(), long_line), long_line]
+    if decision == _DATED_HINT:
+        return 'experience' if YEAR_PATTERN.search(line) else None
+    return decision
@@ -0,0 +1,137 @@
+import re
+
+from chat_context import build_context, estimate_tokens, record_turn
+
+QUESTION_SYSTEM_PROMPT = 'You are an expert technical recruiter. Generate interview questions based on the candidate\'s CV. Be specific and relevant.'
+
+QUESTION_PREFIX = re.compile(r'^(question\s+)?[\d]+[\.\):]?\s+', re.IGNORECASE)
+
+
+def question_messages(summary, num_questions=4):
+    """
+    Chat messages asking the model for `num_questions` CV-specific questions
+    """
+    prompt = f"""You are an experienced technical recruiter conducting job interviews. Based on the following candidate's CV summary, generate exactly {num_questions} insightful interview questions.
+
+Requirements for questions:
+1. Be SPECIFIC to the candidate's actual experience, skills, and projects mentioned in their CV
+2. Test both technical knowledge and problem-solving abilities
+3. Be open-ended to encourage detailed responses
+4. Cover different aspects: technical skills, projects, experience, and soft skills
+5. Make questions conversational and professional
+
+CV Summary:
+{summary}
+
+Generate exactly {num_questions} interview questions. Format each question on a new line, numbered 1-{num_questions}. Do not add any other text or explanations."""
+
+    return [
+        {'role': 'system', 'content': QUESTION_SYSTEM_PROMPT},
+        {'role': 'user', 'content': prompt}
+    ]
+
+
+def parse_questions(questions_text):
+    """
+    Pull numbered questions ("1.", "1)", "Q1:", "Question 1:") out of a completion
+    """
+    questions = []
+    for line in questions_text.strip().split('\n'):
+        line = line.strip()
+        if QUESTION_PREFIX.match(line):
+            # Remove the number prefix
+            question = QUESTION_PREFIX.sub('', line).strip()
+            if question and len(question) > 10:
+                questions.append(question)
+    return questions
+
+
+INTERVIEWER_PROMPT = """You are an experienced technical interviewer conducting an interview.
+You have reviewed the candidate's CV:
+
+{cv_summary}
+
+Your role is to:
+- Ask insightful follow-up questions based on their responses
+- Probe deeper into their technical experience
+- Assess their problem-solving abilities
+- Be professional but conversational
+- Keep responses concise (2-3 sentences max)"""
+
+EARLIER_HEADER = "\n\nEarlier in the interview (condensed):\n"
+
+
+def interviewer_messages(message, cv_summary, conversation_history):
+    """
+    Chat messages for one AI interviewer turn, within the chat_context token
+    budget: recent turns verbatim, older ones condensed, CV trimmed to the topic
+    """
+    fixed_tokens = estimate_tokens(INTERVIEWER_PROMPT) + estimate_tokens(EARLIER_HEADER)
+    context = build_context(message, cv_summary, conversation_history, fixed_tokens=fixed_tokens)
+    system_prompt = INTERVIEWER_PROMPT.format(cv_summary=context["cv_summary"])
+    if context["earlier"]:
+        system_prompt += EARLIER_HEADER + context["earlier"]
+    record_turn(context["stats"])
+
+    messages = [{'role': 'system', 'content': system_prompt}]
+    messages.extend(context["history"])
+    messages.append({'role': 'user', 'content': message})
+    return messages
+
+
+SCORING_SYSTEM_PROMPT = 'You are an expert technical recruiter evaluating interview performance. Be fair but constructive in your evaluation.'
+
+DEFAULT_SCORE = 7.0
+DEFAULT_FEEDBACK = "Good effort in the interview. Keep practicing to improve your responses."
+
+
+def scoring_messages(questions, responses):
+    """
+    Chat messages asking the model to score the candidate's answers
+    """
+    score_prompt = f"""You are an experienced technical recruiter evaluating a candidate's interview performance.
+
+Interview Questions and Candidate's Responses:
+"""
+    for i, (question, response) in enumerate(zip(questions, responses), 1):
+        score_prompt += f"\nQuestion {i}: {question}\nCandidate's Response: {response}\n"
+
+    score_prompt += """
+Based on the candidate's responses, evaluate their performance on the following criteria:
+1. Technical knowledge and expertise
+2. Communication skills and clarity
+3. Problem-solving abilities
+4. Relevance and depth of answers
+5. Overall professionalism
+
+Provide a score from 0 to 10 (where 10 is excellent) and a brief 2-3 sentence feedback explaining the score.
+
+Format your response EXACTLY as:
+SCORE: [number from 0-10]
+FEEDBACK: [your 2-3 sentence feedback]"""
+
+    return [
+        {'role': 'system', 'content': SCORING_SYSTEM_PROMPT},
+        {'role': 'user', 'content': score_prompt}
+    ]
+
+
+def parse_evaluation(ai_evaluation):
+    """
+    Return (score, feedback) from a "SCORE: ... FEEDBACK: ..." completion
+    """
+    score_match = re.search(r'SCORE:\s*(\d+(?:\.\d+)?)', ai_evaluation, re.IGNORECASE)
+    feedback_match = re.search(r'FEEDBACK:\s*(.+)', ai_evaluation, re.IGNORECASE | re.DOTALL)
+
+    if score_match:
+        score = float(score_match.group(1))
+        score = min(10, max(0, score))  # Ensure score is between 0-10
+    else:
+        score = DEFAULT_SCORE  # Default score if parsing fails
+
+    if feedback_match:
+        feedback = feedback_match.group(1).strip()
+    else:
+        feedback = DEFAULT_FEEDBACK
+
+    return score, feedback
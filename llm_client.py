@@ -0,0 +1,279 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+OPENROUTER_URL = 'https://openrouter.ai/api/v1/chat/completions'
+DEFAULT_MODEL = 'meta-llama/llama-3.3-70b-instruct:free'
+
+DEFAULT_TIMEOUT = float(os.environ.get("LLM_TIMEOUT", "30"))
+MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", "3"))
+MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", "8"))
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 8.0
+
+
+class LLMError(Exception):
+    """
+    Raised when a chat completion cannot be obtained within its deadline
+    """
+
+    def __init__(self, message, status_code=None, body=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.body = body
+
+
+def _build_session():
+    session = requests.Session()
+    # Keep-alive pool sized to the concurrency limit so no call waits on a socket
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=MAX_CONCURRENCY)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_session = _build_session()
+_slots = threading.BoundedSemaphore(MAX_CONCURRENCY)
+
+_metrics_lock = threading.Lock()
+_metrics = {
+    "calls": 0,
+    "failures": 0,
+    "retries": 0,
+    "latency_total_s": 0.0,
+    "latency_max_s": 0.0,
+    "prompt_tokens": 0,
+    "completion_tokens": 0,
+    "total_tokens": 0,
+    "streams": 0,
+    "abandoned_streams": 0,
+    "ttft_total_s": 0.0,
+    "ttft_count": 0,
+}
+_recent_latencies = deque(maxlen=500)
+_recent_ttfts = deque(maxlen=500)
+
+
+def _record(latency, usage=None, failed=False, retries=0, ttft=None, stream=False, abandoned=False):
+    with _metrics_lock:
+        _metrics["calls"] += 1
+        if stream:
+            _metrics["streams"] += 1
+        if abandoned:
+            _metrics["abandoned_streams"] += 1
+        if ttft is not None:
+            _metrics["ttft_total_s"] += ttft
+            _metrics["ttft_count"] += 1
+            _recent_ttfts.append(ttft)
+        _metrics["retries"] += retries
+        if failed:
+            _metrics["failures"] += 1
+        _metrics["latency_total_s"] += latency
+        _metrics["latency_max_s"] = max(_metrics["latency_max_s"], latency)
+        _recent_latencies.append(latency)
+        for field in ("prompt_tokens", "completion_tokens", "total_tokens"):
+            _metrics[field] += int((usage or {}).get(field) or 0)
+
+
+def get_metrics():
+    """
+    Snapshot of call counts, latency and token usage since start-up
+    """
+    with _metrics_lock:
+        snapshot = dict(_metrics)
+        latencies = sorted(_recent_latencies)
+        ttfts = sorted(_recent_ttfts)
+    calls = snapshot["calls"]
+    snapshot["latency_avg_s"] = round(snapshot["latency_total_s"] / calls, 3) if calls else 0.0
+    if latencies:
+        snapshot["latency_p50_s"] = _percentile(latencies, 0.5)
+        snapshot["latency_p95_s"] = _percentile(latencies, 0.95)
+    if ttfts:
+        snapshot["ttft_avg_s"] = round(snapshot["ttft_total_s"] / snapshot["ttft_count"], 3)
+        snapshot["ttft_p50_s"] = _percentile(ttfts, 0.5)
+        snapshot["ttft_p95_s"] = _percentile(ttfts, 0.95)
+    return snapshot
+
+
+def _percentile(sorted_values, fraction):
+    return round(sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))], 3)
+
+
+def _backoff_delay(attempt, retry_after=None):
+    if retry_after:
+        try:
+            return min(float(retry_after), BACKOFF_CAP)
+        except ValueError:
+            pass
+    # Full jitter: spread retries so concurrent callers don't retry in lockstep
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+
+
+def _headers(api_key, extra_headers=None):
+    headers = {
+        'Authorization': f'Bearer {api_key}',
+        'Content-Type': 'application/json'
+    }
+    if extra_headers:
+        headers.update(extra_headers)
+    return headers
+
+
+def _payload(messages, model, temperature, max_tokens, stream=False):
+    payload = {'model': model, 'messages': messages}
+    if temperature is not None:
+        payload['temperature'] = temperature
+    if max_tokens is not None:
+        payload['max_tokens'] = max_tokens
+    if stream:
+        payload['stream'] = True
+    return payload
+
+
+def chat_completion(messages, api_key, model=DEFAULT_MODEL, temperature=None, max_tokens=None,
+                    deadline=DEFAULT_TIMEOUT, max_retries=MAX_RETRIES, extra_headers=None):
+    """
+    Send a chat completion request and return the assistant's message content.
+
+    `deadline` bounds the whole call in seconds, including time spent waiting
+    for a concurrency slot and for retries. Raises LLMError on failure.
+    """
+    payload = _payload(messages, model, temperature, max_tokens)
+    started = time.monotonic()
+    expires = started + deadline
+    retries = 0
+    _acquire_slot(expires)
+    try:
+        response, retries = _post_with_retries(payload, api_key, expires, max_retries, extra_headers)
+        try:
+            result = response.json()
+            content = result['choices'][0]['message']['content']
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            raise LLMError(f"Malformed API response: {e}", status_code=200, body=response.text)
+    except LLMError as e:
+        _record(time.monotonic() - started, failed=True, retries=getattr(e, "retries", retries))
+        raise
+    finally:
+        _slots.release()
+    _record(time.monotonic() - started, result.get('usage'), retries=retries)
+    return content
+
+
+def stream_chat_completion(messages, api_key, model=DEFAULT_MODEL, temperature=None, max_tokens=None,
+                           deadline=DEFAULT_TIMEOUT, max_retries=MAX_RETRIES, extra_headers=None):
+    """
+    Generator yielding the assistant's reply as text deltas from an SSE stream.
+
+    Retries only happen before the first token arrives. Time-to-first-token
+    is recorded separately from total latency; a stream the consumer closes
+    early counts as abandoned, not failed. Raises LLMError on failure.
+    """
+    payload = _payload(messages, model, temperature, max_tokens, stream=True)
+    started = time.monotonic()
+    expires = started + deadline
+    retries = 0
+    first_token_at = None
+    usage = None
+    completed = abandoned = False
+    _acquire_slot(expires)
+    try:
+        response, retries = _post_with_retries(payload, api_key, expires, max_retries, extra_headers, stream=True)
+        response.encoding = 'utf-8'  # SSE is UTF-8; requests would guess ISO-8859-1 for text/*
+        with response:
+            for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+                if time.monotonic() > expires:
+                    raise LLMError("LLM deadline exceeded")
+                # Blank keep-alives and ": OPENROUTER PROCESSING" comments carry no data
+                if not line or line.startswith(':') or not line.startswith('data:'):
+                    continue
+                data = line[len('data:'):].strip()
+                if data == '[DONE]':
+                    break
+                try:
+                    chunk = json.loads(data)
+                except ValueError:
+                    continue
+                if chunk.get('error'):
+                    raise LLMError(f"Stream error: {chunk['error']}")
+                usage = chunk.get('usage') or usage
+                choices = chunk.get('choices') or [{}]
+                delta = (choices[0].get('delta') or {}).get('content')
+                if delta:
+                    if first_token_at is None:
+                        first_token_at = time.monotonic()
+                    yield delta
+        completed = True
+    except (requests.ConnectionError, requests.Timeout) as e:
+        raise LLMError(f"Stream interrupted: {e}")
+    except LLMError as e:
+        retries = getattr(e, "retries", retries)
+        raise
+    except GeneratorExit:
+        abandoned = True  # The consumer stopped reading (e.g. client disconnect)
+        raise
+    finally:
+        _slots.release()
+        ttft = first_token_at - started if first_token_at is not None else None
+        failed = not (completed or abandoned)
+        _record(time.monotonic() - started, None if failed else usage, failed=failed, retries=retries,
+                ttft=None if failed else ttft, stream=True, abandoned=abandoned)
+
+
+def _acquire_slot(expires):
+    if not _slots.acquire(timeout=max(0.0, expires - time.monotonic())):
+        _record(0.0, failed=True)
+        raise LLMError("LLM concurrency limit reached")
+
+
+def _post_with_retries(payload, api_key, expires, max_retries, extra_headers, stream=False):
+    """
+    POST until a 200 arrives; the caller must already hold a concurrency slot
+    """
+    retries = 0
+    for attempt in range(max_retries + 1):
+        remaining = expires - time.monotonic()
+        if remaining <= 0:
+            error = LLMError("LLM deadline exceeded")
+            break
+        retry_after = None
+        try:
+            response = _session.post(
+                OPENROUTER_URL,
+                headers=_headers(api_key, extra_headers),
+                json=payload,
+                timeout=remaining,
+                stream=stream
+            )
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = LLMError(f"Request failed: {e}")
+        else:
+            if response.status_code == 200:
+                return response, retries
+            error = LLMError(
+                f"API Error {response.status_code}: {response.text}",
+                status_code=response.status_code,
+                body=response.text
+            )
+            response.close()
+            if response.status_code not in RETRY_STATUSES:
+                break
+            retry_after = response.headers.get('Retry-After')
+
+        delay = _backoff_delay(attempt, retry_after)
+        if attempt == max_retries or time.monotonic() + delay >= expires:
+            break
+        logger.info("LLM call failed (%s), retrying in %.2fs", error, delay)
+        retries += 1
+        time.sleep(delay)
+    error.retries = retries
+    raise error
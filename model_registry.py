@@ -0,0 +1,100 @@
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    """
+    Loads heavy models on first use (or on an explicit warmup) instead of at
+    import time. Each model has its own lock, so loading Whisper never blocks
+    a request that only needs spaCy.
+    """
+
+    def __init__(self):
+        self._loaders = {}
+        self._models = {}
+        self._locks = {}
+        self._status = {}
+        self._registry_lock = threading.Lock()
+
+    def register(self, name, loader):
+        """
+        Register `loader()` as the factory for model `name`
+        """
+        with self._registry_lock:
+            self._loaders[name] = loader
+            self._locks.setdefault(name, threading.Lock())
+            self._status.setdefault(name, {"loaded": False, "load_seconds": None, "error": None})
+
+    def get(self, name):
+        """
+        Return model `name`, loading it first if needed
+        """
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        if name not in self._loaders:
+            raise KeyError(f"Unknown model '{name}'")
+        with self._locks[name]:
+            model = self._models.get(name)
+            if model is None:
+                model = self._load(name)
+        return model
+
+    def _load(self, name):
+        logger.info("Loading model '%s'...", name)
+        started = time.perf_counter()
+        try:
+            model = self._loaders[name]()
+        except Exception as e:
+            self._status[name].update(error=f"{type(e).__name__}: {e}")
+            logger.exception("Loading model '%s' failed", name)
+            raise
+        elapsed = time.perf_counter() - started
+        self._models[name] = model
+        self._status[name].update(loaded=True, load_seconds=round(elapsed, 3), loaded_at=time.time(), error=None)
+        logger.info("Model '%s' loaded in %.2fs", name, elapsed)
+        return model
+
+    def is_loaded(self, name):
+        return name in self._models
+
+    def warmup(self, names=None):
+        """
+        Load `names` (default: every registered model) now. Failures are
+        recorded in status() rather than raised.
+        """
+        for name in list(self._loaders) if names is None else names:
+            try:
+                self.get(name)
+            except Exception:
+                pass
+        return self.status()
+
+    def warmup_in_background(self, names=None):
+        if names is not None and not names:
+            return None
+        thread = threading.Thread(target=self.warmup, args=(names,), name="model-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def status(self):
+        """
+        Per-model load state and load time, for readiness/startup reporting
+        """
+        with self._registry_lock:
+            return {name: dict(status) for name, status in self._status.items()}
+
+
+def models_from_env(variable="WARMUP_MODELS"):
+    """
+    Model names listed (comma separated) in an environment variable
+    """
+    return [name.strip() for name in os.environ.get(variable, "").split(",") if name.strip()]
+
+
+# Process-wide registry shared by every module in a service
+registry = ModelRegistry()
@@ -0,0 +1,86 @@
+import os
+from itertools import islice
+from io import BytesIO, StringIO
+
+ENGINES = ("pypdf2", "pdfminer")
+DEFAULT_ENGINE = os.environ.get("PDF_ENGINE", "pypdf2")
+
+# Budget applied to CV extraction; 0 disables the limit
+DEFAULT_MAX_PAGES = int(os.environ.get("PDF_MAX_PAGES", "20"))
+DEFAULT_MAX_CHARS = int(os.environ.get("PDF_MAX_CHARS", "100000"))
+
+# How each engine's pages are glued back together. pdfminer already ends
+# every page with a form feed, so joining with "" matches its extract_text.
+PAGE_SEPARATORS = {"pypdf2": "\n", "pdfminer": ""}
+
+
+def _as_stream(source):
+    if isinstance(source, (bytes, bytearray)):
+        return BytesIO(source)
+    return source
+
+
+def _iter_pypdf2(stream):
+    import PyPDF2
+
+    reader = PyPDF2.PdfReader(stream)
+    # reader.pages parses page objects on access, so stopping early skips the rest
+    for page in reader.pages:
+        yield page.extract_text() or ""
+
+
+def _iter_pdfminer(stream):
+    from pdfminer.converter import TextConverter
+    from pdfminer.layout import LAParams
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.pdfpage import PDFPage
+
+    output = StringIO()
+    rsrcmgr = PDFResourceManager(caching=True)
+    device = TextConverter(rsrcmgr, output, codec="utf-8", laparams=LAParams())
+    interpreter = PDFPageInterpreter(rsrcmgr, device)
+    try:
+        for page in PDFPage.get_pages(stream, caching=True):
+            interpreter.process_page(page)
+            text = output.getvalue()
+            output.seek(0)
+            output.truncate(0)
+            yield text
+    finally:
+        device.close()
+
+
+def iter_pdf_pages(source, engine=DEFAULT_ENGINE, max_pages=0):
+    """
+    Lazily yield the text of each page of a PDF (bytes, path or binary stream).
+    Pages after `max_pages` are never parsed; closing the generator early
+    stops parsing as well.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown PDF engine '{engine}', expected one of {ENGINES}")
+    stream = _as_stream(source)
+    pages = _iter_pypdf2(stream) if engine == "pypdf2" else _iter_pdfminer(stream)
+    try:
+        yield from (islice(pages, max_pages) if max_pages else pages)
+    finally:
+        pages.close()
+
+
+def extract_pdf_text(source, engine=DEFAULT_ENGINE, max_pages=DEFAULT_MAX_PAGES, max_chars=DEFAULT_MAX_CHARS):
+    """
+    Extract text page by page, stopping as soon as the page or character
+    budget is spent
+    """
+    separator = PAGE_SEPARATORS[engine]
+    parts = []
+    total = 0
+    for text in iter_pdf_pages(source, engine=engine, max_pages=max_pages):
+        if parts:
+            parts.append(separator)
+            total += len(separator)
+        parts.append(text)
+        total += len(text)
+        if max_chars and total >= max_chars:
+            break
+    text = "".join(parts)
+    return text[:max_chars] if max_chars else text
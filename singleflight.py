@@ -0,0 +1,96 @@
+import asyncio
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key: the first caller runs the
+    function, the others wait for it and get the same result (or exception).
+    Nothing is kept once the call finishes; results that should outlive it
+    belong in a cache in front of this.
+
+    `do` is for threads (Streamlit sessions), `do_async` for an event loop.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._calls = {}  # key -> _Call (threads)
+        self._tasks = {}  # key -> asyncio.Task (event loop)
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "executed": 0, "shared": 0, "errors": 0}
+
+    def _join(self, key, calls, start):
+        """
+        (call, leader): the in-flight call for `key`, or a new one from `start()`
+        """
+        with self._lock:
+            self._stats["calls"] += 1
+            call = calls.get(key)
+            if call is not None:
+                self._stats["shared"] += 1
+                logger.info("[%s] joining in-flight call %s", self.name, str(key)[:12])
+                return call, False
+            self._stats["executed"] += 1
+            call = calls[key] = start()
+            return call, True
+
+    def do(self, key, fn):
+        """
+        Return `fn()`, or the result of the identical call already running
+        """
+        call, leader = self._join(key, self._calls, _Call)
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = fn()
+            return call.value
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self._stats["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key, fn):
+        """
+        Await `fn()` (a coroutine function), or the identical call already
+        running. The shared call runs as its own task, so a caller that is
+        cancelled does not cancel it for the others.
+        """
+        task, leader = self._join(key, self._tasks, lambda: asyncio.ensure_future(fn()))
+        if leader:
+            task.add_done_callback(lambda t: self._finished(key, t))
+        return await asyncio.shield(task)
+
+    def _finished(self, key, task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled() and task.exception() is not None:  # Also marks it retrieved
+            with self._lock:
+                self._stats["errors"] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._calls) + len(self._tasks)
+        stats["saved_ratio"] = round(stats["shared"] / stats["calls"], 3) if stats["calls"] else 0.0
+        return stats
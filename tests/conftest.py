@@ -0,0 +1,7 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Shared helpers live at the repository root, the services in backend/
+sys.path[:0] = [ROOT, os.path.join(ROOT, "backend")]
+os.environ.setdefault("QUIZ_STORE_BACKEND", "memory")
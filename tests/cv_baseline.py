@@ -0,0 +1,271 @@
+"""
+Frozen copy of summarize_cv and extract_cv_content_intelligent as they were
+before the single-pass section classifier (cv_sections.py), plus a seeded
+synthetic CV corpus. The parity test and benchmarks/bench_cv_sections.py
+compare app.summarize_cv against these; do not edit them to follow app.py.
+"""
+import random
+import re
+
+from cv_sections import CONTENT_KEYWORDS
+
+def extract_cv_content_intelligent(lines):
+    """
+    Intelligent extraction when no clear section headers are found
+    """
+    sections = {
+        'profile': [],
+        'skills': [],
+        'experience': [],
+        'education': [],
+        'projects': [],
+        'languages': [],
+        'certifications': []
+    }
+    
+    # Keywords for classification
+    skill_keywords = ['python', 'java', 'javascript', 'react', 'node', 'docker', 'kubernetes', 
+                     'aws', 'azure', 'gcp', 'ci/cd', 'devops', 'git', 'sql', 'mongodb',
+                     'framework', 'library', 'database', 'tool', 'technology', 'angular', 'vue']
+    
+    experience_keywords = ['intern', 'developer', 'engineer', 'manager', 'analyst', 'consultant',
+                          'worked', 'developed', 'implemented', 'led', 'managed', 'designed']
+    
+    education_keywords = ['university', 'college', 'school', 'degree', 'bachelor', 'master',
+                         'diploma', 'baccalaureate', 'engineering', 'computer science', 'esprit']
+    
+    project_keywords = ['project', 'platform', 'application', 'system', 'website', 'app',
+                       'developed', 'built', 'created', 'implemented']
+    
+    cert_keywords = ['certification', 'certificate', 'certified', 'ccna', 'aws certified',
+                    'training', 'course']
+    
+    language_keywords = ['english', 'french', 'arabic', 'spanish', 'german', 'fluent', 'native']
+    
+    for line in lines:
+        line_lower = line.lower()
+        
+        # Skip very short lines
+        if len(line) < 10:
+            continue
+        
+        # Classify line based on keywords
+        if any(kw in line_lower for kw in education_keywords):
+            sections['education'].append(line)
+        elif any(kw in line_lower for kw in cert_keywords):
+            sections['certifications'].append(line)
+        elif any(kw in line_lower for kw in language_keywords) and len(line) < 100:
+            sections['languages'].append(line)
+        elif any(kw in line_lower for kw in project_keywords):
+            sections['projects'].append(line)
+        elif any(kw in line_lower for kw in experience_keywords):
+            sections['experience'].append(line)
+        elif any(kw in line_lower for kw in skill_keywords):
+            sections['skills'].append(line)
+        elif re.search(r'\d{4}', line) and any(kw in line_lower for kw in ['tunis', 'intern', 'engineer']):
+            sections['experience'].append(line)
+    
+    return sections
+
+def summarize_cv(text):
+    """
+    Parse and summarize CV content into structured sections
+    """
+    # Clean and normalize text
+    text = text.strip()
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    
+    # Initialize sections
+    sections = {
+        'profile': [],
+        'skills': [],
+        'experience': [],
+        'education': [],
+        'projects': [],
+        'languages': [],
+        'certifications': []
+    }
+    
+    current_section = None
+    buffer = []
+    
+    # Section header patterns
+    section_headers = {
+        'profile': r'^(profile|summary|about|objective|introduction)$',
+        'skills': r'^(skills?|technical skills?|competenc|technologies|expertise)$',
+        'experience': r'^(experience|work experience|employment|professional experience)$',
+        'education': r'^(education|academic|qualifications?)$',
+        'projects': r'^(projects?|portfolio|work samples?)$',
+        'languages': r'^(languages?|linguistic skills?)$',
+        'certifications': r'^(certifications?|certificates?|training|courses?)$'
+    }
+    
+    # Detect section headers and group content
+    for line in lines:
+        line_lower = line.lower().strip()
+        
+        # Check if this is a major section header
+        is_section_header = False
+        if len(line.split()) <= 4:  # Section headers are usually short
+            for section_name, pattern in section_headers.items():
+                if re.match(pattern, line_lower, re.I):
+                    # Save previous section
+                    if current_section and buffer:
+                        sections[current_section].extend(buffer)
+                    
+                    current_section = section_name
+                    buffer = []
+                    is_section_header = True
+                    break
+        
+        # Add content to buffer if not a header
+        if not is_section_header and line:
+            # Filter out very short lines and page numbers
+            if len(line) > 5 and not re.match(r'^\d+$', line):
+                buffer.append(line)
+    
+    # Save last section
+    if current_section and buffer:
+        sections[current_section].extend(buffer)
+    
+    # If no clear sections detected, try intelligent extraction
+    if not any(sections.values()):
+        sections = extract_cv_content_intelligent(lines)
+    
+    # Build formatted summary
+    summary = ""
+    
+    # Profile/Summary
+    if sections['profile']:
+        summary += "## Professional Profile\n\n"
+        for item in sections['profile'][:3]:
+            summary += f"{item}\n\n"
+    
+    # Education (show first for students/recent grads)
+    if sections['education']:
+        summary += "## Education\n\n"
+        for item in sections['education'][:5]:
+            if not item.startswith(('•', '-', '●', '○')):
+                summary += f"- {item}\n"
+            else:
+                summary += f"{item}\n"
+        summary += "\n"
+    
+    # Skills
+    if sections['skills']:
+        summary += "## Technical Skills\n\n"
+        # Group skills if they contain colons (e.g., "Languages: Python, Java")
+        for item in sections['skills'][:20]:
+            if ':' in item and len(item.split(':')[0]) < 30:
+                # This is a categorized skill
+                summary += f"**{item.split(':')[0]}:** {item.split(':', 1)[1].strip()}\n\n"
+            else:
+                if not item.startswith(('•', '-', '●', '○')):
+                    summary += f"- {item}\n"
+                else:
+                    summary += f"{item}\n"
+        summary += "\n"
+    
+    # Experience
+    if sections['experience']:
+        summary += "## Professional Experience\n\n"
+        for item in sections['experience'][:15]:
+            # Check if it's a job title/company line (usually shorter and contains dates)
+            if re.search(r'\d{4}|\d{2}/\d{4}', item) and len(item) < 150:
+                summary += f"\n**{item}**\n"
+            else:
+                if not item.startswith(('•', '-', '●', '○')):
+                    summary += f"  - {item}\n"
+                else:
+                    summary += f"  {item}\n"
+        summary += "\n"
+    
+    # Projects
+    if sections['projects']:
+        summary += "## Projects\n\n"
+        for item in sections['projects'][:12]:
+            # Check if it's a project title (usually has | or – separator)
+            if '|' in item or '–' in item or '—' in item:
+                summary += f"\n**{item}**\n"
+            else:
+                if not item.startswith(('•', '-', '●', '○')):
+                    summary += f"  - {item}\n"
+                else:
+                    summary += f"  {item}\n"
+        summary += "\n"
+    
+    # Languages
+    if sections['languages']:
+        summary += "## Languages\n\n"
+        for item in sections['languages'][:5]:
+            if not item.startswith(('•', '-', '●', '○')):
+                summary += f"- {item}\n"
+            else:
+                summary += f"{item}\n"
+        summary += "\n"
+    
+    # Certifications
+    if sections['certifications']:
+        summary += "## Certifications\n\n"
+        for item in sections['certifications'][:8]:
+            if not item.startswith(('•', '-', '●', '○')):
+                summary += f"- {item}\n"
+            else:
+                summary += f"{item}\n"
+        summary += "\n"
+    
+    # Fallback if nothing was extracted
+    if not summary.strip():
+        summary = "## CV Content\n\n"
+        summary += "Unable to parse CV structure. Here's the extracted content:\n\n"
+        for line in lines[:30]:
+            if len(line) > 10:
+                summary += f"- {line}\n"
+    
+    return summary.strip()
+
+
+
+# ---------------- Synthetic corpus ---------------- #
+
+HEADERS = ["Profile", "SUMMARY", "Skills", "Technical Skills", "Experience", "Work Experience",
+           "Education", "Projects", "Portfolio", "Languages", "Certifications", "Training",
+           "Hobbies", "References", "competenc", "Professional Experience"]
+FILLER = ["team", "player", "results", "driven", "customer", "delivery", "agile", "scrum",
+          "quality", "stakeholders", "performance", "scalable", "clean", "code", "reviews",
+          "skilled", "appetite", "nodes", "javascripting", "engineers", "masters", "tunisia"]
+
+
+def synthetic_line(rng):
+    words = rng.sample(FILLER, rng.randint(2, 8))
+    for _ in range(rng.randint(0, 3)):
+        category = rng.choice(list(CONTENT_KEYWORDS))
+        words.insert(rng.randint(0, len(words)), rng.choice(CONTENT_KEYWORDS[category]).title())
+    if rng.random() < 0.3:
+        words.append(f"{rng.randint(2010, 2025)} - Tunis")
+    if rng.random() < 0.1:
+        words = words * 6  # long lines exercise the languages length cut-off
+    line = " ".join(words)
+    if rng.random() < 0.3:
+        line = rng.choice(["• ", "- ", "● "]) + line
+    if rng.random() < 0.1:
+        line = line.replace(" ", ": ", 1) if rng.random() < 0.5 else line + " | Python – Flask"
+    return line
+
+
+def synthetic_cv(rng):
+    lines = []
+    with_headers = rng.random() < 0.6
+    for _ in range(rng.randint(15, 60)):
+        if with_headers and rng.random() < 0.15:
+            lines.append(rng.choice(HEADERS))
+        elif rng.random() < 0.05:
+            lines.append(str(rng.randint(1, 9)))
+        else:
+            lines.append(synthetic_line(rng))
+    return "\n".join(lines)
+
+
+def synthetic_corpus(count, seed=7):
+    rng = random.Random(seed)
+    return [synthetic_cv(rng) for _ in range(count)]
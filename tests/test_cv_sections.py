@@ -0,0 +1,42 @@
+import pytest
+
+pytest.importorskip("streamlit")
+
+import app  # noqa: E402
+import cv_baseline  # noqa: E402
+
+CV_WITH_HEADERS = """
+Jane Doe
+Profile
+Backend developer focused on APIs and data pipelines.
+Technical Skills
+Languages: Python, Java, SQL
+• Docker, Kubernetes, AWS
+Work Experience
+Software Engineer Intern – Acme 2023 - Tunis
+Developed REST services with Flask and PostgreSQL
+Projects
+Interview Platform | Python – FastAPI
+Education
+Master in Computer Science, Esprit 2024
+Languages
+English (fluent), French, Arabic
+Certifications
+AWS Certified Cloud Practitioner
+3
+"""
+
+
+def test_summarize_cv_matches_baseline_on_sectioned_cv():
+    assert app.summarize_cv(CV_WITH_HEADERS) == cv_baseline.summarize_cv(CV_WITH_HEADERS)
+
+
+def test_summarize_cv_matches_baseline_on_synthetic_corpus():
+    for text in cv_baseline.synthetic_corpus(500):
+        assert app.summarize_cv(text) == cv_baseline.summarize_cv(text), text
+
+
+def test_intelligent_extraction_matches_baseline():
+    lines = [line.strip() for text in cv_baseline.synthetic_corpus(200, seed=11)
+             for line in text.splitlines() if line.strip()]
+    assert app.extract_cv_content_intelligent(lines) == cv_baseline.extract_cv_content_intelligent(lines)
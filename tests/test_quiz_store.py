@@ -0,0 +1,27 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from quiz_store import MemoryQuizStore  # noqa: E402
+
+
+def test_memory_store_evicts_least_recently_used():
+    store = MemoryQuizStore(ttl=60, max_entries=3)
+    for quiz_id in ("a", "b", "c"):
+        store.put(quiz_id, {"question_ids": [quiz_id]})
+
+    assert store.get("a") == {"question_ids": ["a"]}
+    store.put("d", {"question_ids": ["d"]})
+
+    assert store.get("a") is not None
+    assert store.get("b") is None
+    assert store.get("c") is not None
+    assert store.stats()["evictions"] == 1
+
+
+def test_memory_store_expires_entries():
+    store = MemoryQuizStore(ttl=-1, max_entries=3)
+    store.put("a", {"question_ids": []})
+
+    assert store.get("a") is None
+    assert store.stats()["expired"] == 1
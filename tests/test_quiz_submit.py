@@ -0,0 +1,59 @@
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("flask_cors")
+
+import appp  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    return appp.app.test_client()
+
+
+@pytest.fixture
+def quiz(client):
+    response = client.post("/generate-quiz", data={"text": "Python developer with SQL and Docker", "seed": "1"})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_bulk_reports_malformed_submissions_per_item(client, quiz):
+    first = quiz["questions"][0]
+    good = {"quiz_id": quiz["quiz_id"], "answers": [{"id": first["id"], "answer": 0}]}
+    submissions = [
+        good,
+        {"quiz_id": ["not", "hashable"], "answers": []},
+        {"quiz_id": {"a": 1}, "answers": []},
+        {"quiz_id": quiz["quiz_id"], "answers": "0,1,2"},
+        {"quiz_id": quiz["quiz_id"], "answers": [{"id": ["x"], "answer": 0}, "junk"]},
+        {"quiz_id": "unknown", "answers": []},
+        "not an object",
+        good,
+    ]
+    response = client.post("/submit-quiz/bulk", json={"submissions": submissions})
+
+    assert response.status_code == 200
+    body = response.get_json()
+    results = body["results"]
+    assert len(results) == len(submissions)
+    assert body["graded"] == 3
+    for i in (0, 4, 7):
+        assert "error" not in results[i]
+        assert results[i]["quiz_id"] == quiz["quiz_id"]
+        assert results[i]["total"] == len(quiz["questions"])
+    assert results[0]["score"] == results[7]["score"]
+    assert results[4]["score"] == 0
+    assert results[1] == {"quiz_id": ["not", "hashable"], "error": "Invalid quiz_id"}
+    assert results[2]["error"] == "Invalid quiz_id"
+    assert results[3]["error"] == "'answers' must be a list"
+    assert results[5] == {"quiz_id": "unknown", "error": "Invalid quiz_id"}
+    assert results[6]["quiz_id"] is None and results[6]["error"]
+
+
+def test_single_submit_rejects_malformed_body(client, quiz):
+    assert client.post("/submit-quiz", json={"quiz_id": [1], "answers": []}).status_code == 400
+    assert client.post("/submit-quiz", json={"quiz_id": quiz["quiz_id"], "answers": {"a": 1}}).status_code == 400
+    response = client.post("/submit-quiz", json={"quiz_id": quiz["quiz_id"], "answers": []})
+    assert response.status_code == 200
+    assert response.get_json()["score"] == 0
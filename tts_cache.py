@@ -0,0 +1,122 @@
+import logging
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from cache_store import TwoTierCache, make_key
+
+logger = logging.getLogger(__name__)
+
+_CACHE_DIR = os.environ.get(
+    "TTS_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "tts")
+)
+
+# Memory LRU in front of a size-capped disk tier; audio is keyed by the
+# cleaned-up text so markdown/emoji variants of one sentence share an entry.
+audio_cache = TwoTierCache(
+    "tts",
+    max_entries=int(os.environ.get("TTS_CACHE_MAX_ENTRIES", "256")),
+    disk_dir=_CACHE_DIR or None,
+    disk_max_bytes=int(os.environ.get("TTS_CACHE_DISK_MAX_BYTES", str(200 * 1024 * 1024)))
+)
+
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("TTS_PREWARM_WORKERS", "4")),
+    thread_name_prefix="tts-prewarm"
+)
+_pending = {}  # cache key -> Future of an in-flight synthesis
+_pending_lock = threading.Lock()
+
+
+def clean_tts_text(text):
+    """
+    Strip markdown/emojis and cap the length so gTTS reads natural sentences
+    """
+    clean_text = text.replace("**", "").replace("*", "").replace("-", "").replace("•", "").strip()
+    clean_text = re.sub(r'##\s+[^\n]+', '', clean_text)  # Remove markdown headers
+    clean_text = re.sub(r'[🎯💼🚀🎓🌐📜👤📄⚠️💡✅❓]', '', clean_text)  # Remove emojis
+
+    # Limit text length
+    if len(clean_text) > 500:
+        clean_text = clean_text[:500]
+        last_period = clean_text.rfind('.')
+        if last_period > 100:
+            clean_text = clean_text[:last_period + 1]
+
+    # Remove newlines and extra spaces
+    return " ".join(clean_text.split())
+
+
+def _synthesize(clean_text, language):
+    from gtts import gTTS
+
+    tts = gTTS(text=clean_text, lang=language, slow=False)
+    audio_fp = BytesIO()
+    tts.write_to_fp(audio_fp)
+    return audio_fp.getvalue()
+
+
+def _synthesize_and_store(key, clean_text, language):
+    audio = _synthesize(clean_text, language)
+    audio_cache.set(key, audio)
+    return audio
+
+
+def _speech_for(clean_text, language):
+    key = make_key(language, clean_text)
+    audio = audio_cache.get(key)
+    if audio is not None:
+        return audio
+
+    # A prewarm job may already be synthesizing this sentence: wait for it
+    with _pending_lock:
+        future = _pending.get(key)
+    if future is not None:
+        return future.result()
+    return _synthesize_and_store(key, clean_text, language)
+
+
+def speak(text, language="en"):
+    """
+    Return (mp3_bytes, error) for `text`, serving repeats from the audio cache
+    """
+    try:
+        clean_text = clean_tts_text(text)
+        if not clean_text or len(clean_text) < 10:
+            return None, "Text too short for TTS"
+        return _speech_for(clean_text, language), None
+    except ImportError:
+        return None, "gTTS library not installed. Run: pip install gtts"
+    except Exception as e:
+        return None, f"TTS Error: {str(e)}"
+
+
+def prewarm(texts, language="en"):
+    """
+    Synthesize `texts` in the background so later `speak` calls hit the cache.
+    Returns the number of syntheses scheduled.
+    """
+    scheduled = 0
+    for text in texts:
+        clean_text = clean_tts_text(text)
+        if not clean_text or len(clean_text) < 10:
+            continue
+        key = make_key(language, clean_text)
+        with _pending_lock:
+            if key in _pending or key in audio_cache:
+                continue
+            future = _executor.submit(_synthesize_and_store, key, clean_text, language)
+            _pending[key] = future
+        future.add_done_callback(lambda f, k=key: _prewarm_done(k, f))
+        scheduled += 1
+    return scheduled
+
+
+def _prewarm_done(key, future):
+    with _pending_lock:
+        _pending.pop(key, None)
+    if future.exception() is not None:
+        logger.warning("TTS prewarm failed: %s", future.exception())
@@ -0,0 +1,92 @@
+"""
+Speculative preparation of the interviewer's next turn.
+
+While the candidate answers turn N, turn N+1 (its text and synthesized
+audio) is built in a background thread. Each prepared turn is tagged with
+the version of the conversation it was built for; when the candidate
+submits, the turn is used only if the version still matches, otherwise it
+is dropped and built inline.
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from cache_store import make_key
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("TURN_PREFETCH_WORKERS", "2")),
+    thread_name_prefix="turn-prefetch"
+)
+
+
+def turn_version(questions, index):
+    """
+    Version of turn `index`: it changes if the question list does (new CV,
+    different question count), so a turn prepared for another list is dropped
+    """
+    return make_key("turn", tuple(questions), index)
+
+
+class TurnPrefetcher:
+    """
+    One speculative turn per interview session. `build` must not touch
+    Streamlit state: it runs in a background thread.
+    """
+
+    def __init__(self):
+        self._version = None
+        self._future = None
+        self._lock = threading.Lock()
+        self._stats = {"scheduled": 0, "hits": 0, "waited": 0, "stale": 0, "misses": 0}
+        self._gaps = []  # Submit -> next-turn audio, in seconds
+
+    def schedule(self, version, build):
+        """
+        Start building the turn for `version` unless it is already prepared
+        """
+        with self._lock:
+            if self._version == version:
+                return
+            self._version = version
+            self._future = _executor.submit(build)
+            self._stats["scheduled"] += 1
+
+    def take(self, version, build):
+        """
+        The prepared turn for `version`, or `build()` run now when none matches
+        """
+        with self._lock:
+            future = self._future if self._version == version else None
+            if future is None:
+                self._stats["stale" if self._future is not None else "misses"] += 1
+            self._version = self._future = None
+        if future is None:
+            return build()
+        if not future.done():
+            with self._lock:
+                self._stats["waited"] += 1
+        try:
+            turn = future.result()
+        except Exception as e:
+            logger.warning("Turn prefetch failed, building inline: %s", e)
+            return build()
+        with self._lock:
+            self._stats["hits"] += 1
+        return turn
+
+    def record_gap(self, seconds):
+        with self._lock:
+            self._gaps.append(seconds)
+        logger.info("Next interviewer turn ready %.3fs after submit", seconds)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            gaps = list(self._gaps)
+        if gaps:
+            stats["last_gap_seconds"] = round(gaps[-1], 3)
+            stats["mean_gap_seconds"] = round(sum(gaps) / len(gaps), 3)
+        return stats